@@ -1,222 +1,233 @@
+import os
 import dash
 from dash import dcc, html, Input, Output, State
 import plotly.graph_objects as go
-import numpy as np
-
-# Same data generation as above...
-np.random.seed(42)
-colors = ['#2649B2', '#4A74F3', '#8E7DE3', '#9D5CE6']
-groups = ['Group A', 'Group B', 'Group C', 'Group D']
-
-group_data = {}
-for i, group in enumerate(groups):
-    center_x = (i % 2) * 4 + 2
-    center_y = (i // 2) * 4 + 2
-    
-    n_points = np.random.randint(50, 100)
-    detail_x = np.random.randn(n_points) * 1.2 + center_x
-    detail_y = np.random.randn(n_points) * 1.2 + center_y
-    
-    group_data[group] = {
-        'center': (center_x, center_y),
-        'color': colors[i],
-        'detail_x': detail_x,
-        'detail_y': detail_y,
-        'size': len(detail_x)
-    }
-
-def create_overview_plot():
-    """Create overview with enhanced styling"""
+from functools import lru_cache
+
+from bubbles_diagram import PreprocessedFlexibleFeelingsAnalyzer
+
+# Number of figures kept in memory (least recently used ones are evicted first). A detail figure holds every shade
+# of its group, so the bound stays small; the lighter (X, Y) pairings are kept longer and rebuilding an evicted
+# figure from them is cheap
+FIGURE_CACHE_SIZE = 32
+PAIRING_CACHE_SIZE = 64
+
+# Dash debug mode (reloader + in-browser debugger) only on request: DASH_DEBUG=1 python app.py
+# The reloader runs the app in a second process, which loads the ET dataset again
+DEBUG = os.environ.get("DASH_DEBUG", "").lower() in ("1", "true", "yes")
+
+# Above this number of points, the detail view is drawn with WebGL (scattergl)
+WEBGL_THRESHOLD = 1000
+
+DEFAULT_X = "Respondent count (fixation dwells)"
+DEFAULT_Y = "Dwell time (fixation, ms)"
+
+BUTTON_STYLE = {
+    'backgroundColor': '#2649B2',
+    'color': 'white',
+    'border': 'none',
+    'padding': '12px 24px',
+    'fontSize': '16px',
+    'borderRadius': '25px',
+    'cursor': 'pointer',
+    'marginBottom': '15px',
+    'boxShadow': '0 4px 8px rgba(0,0,0,0.1)',
+    'transition': 'all 0.3s ease'
+}
+
+# ET / Feelings data loaded and pre-processed once, when the app starts
+analyzer = PreprocessedFlexibleFeelingsAnalyzer()
+feelings = list(analyzer.all_feelings_data)
+metrics = analyzer.available_metrics
+default_x = DEFAULT_X if DEFAULT_X in metrics else metrics[0]
+default_y = DEFAULT_Y if DEFAULT_Y in metrics else metrics[-1]
+
+@lru_cache(maxsize=PAIRING_CACHE_SIZE)
+def paired_data(feeling, x_metric, y_metric):
+    """Groups of a feeling for one (X, Y) pair, shared by the overview and the detail views"""
+    data, _ = analyzer.process_feeling_with_metrics(feeling, x_metric, y_metric)
+    return data or {}
+
+def create_overview_plot(feeling, x_metric, y_metric):
+    """One bubble per colour family, sized by its number of clicks"""
     fig = go.Figure()
-    
-    for group, data in group_data.items():
-        center_x, center_y = data['center']
-        
+
+    for group, data in paired_data(feeling, x_metric, y_metric).items():
         fig.add_trace(
             go.Scatter(
-                x=[center_x], 
-                y=[center_y],
+                x=[data['center_x']],
+                y=[data['center_y']],
                 mode='markers+text',
                 marker=dict(
-                    size=60,
+                    size=data['marker_size'],
                     color=data['color'],
-                    opacity=0.8,
-                    line=dict(width=4, color='white')
+                    opacity=1,
+                    line=dict(width=4, color='#DBDBDB')
                 ),
-                text=[group],
+                text=[data['choice']],
                 textposition="middle center",
-                textfont=dict(color='white', size=18, family="Arial Black"),
+                textfont=dict(color='#808080', size=16, family="Arial Black"),
                 name=group,
                 hovertemplate=f"<b>{group}</b><br>" +
-                            f"📊 {data['size']} data points<br>" +
+                            f"📊 {len(data['detail_x'])} shades, {data['choice']} clicks<br>" +
                             "🖱️ <i>Click to explore!</i><extra></extra>",
                 customdata=[group]
             )
         )
-    
+
     fig.update_layout(
         title={
-            'text': "🎯 Interactive Data Explorer - Click any group to dive deep!",
+            'text': f"🎯 {y_metric} vs {x_metric} for {feeling} - Click any color to dive deep!",
             'x': 0.5,
             'xanchor': 'center',
-            'font': {'size': 22, 'color': '#2649B2'}
+            'font': {'size': 20, 'color': '#2649B2'}
         },
-        xaxis_title="X Coordinate",
-        yaxis_title="Y Coordinate",
+        xaxis_title=x_metric,
+        yaxis_title=y_metric,
         height=600,
         showlegend=False,
-        plot_bgcolor='rgba(248,249,250,0.8)',
-        xaxis=dict(range=[-1, 7], gridcolor='rgba(38,73,178,0.1)'),
-        yaxis=dict(range=[-1, 7], gridcolor='rgba(38,73,178,0.1)')
+        plot_bgcolor='#DBDBDB',
+        xaxis=dict(gridcolor='rgba(38,73,178,0.1)'),
+        yaxis=dict(gridcolor='rgba(38,73,178,0.1)')
     )
-    
+
     return fig
 
-def create_detail_plot(selected_group):
-    """Create enhanced detail plot"""
+def create_detail_plot(feeling, x_metric, y_metric, selected_group):
+    """Shades of one colour family, sized by their number of clicks"""
     fig = go.Figure()
-    
-    if selected_group and selected_group in group_data:
-        data = group_data[selected_group]
-        
-        # Add scatter points with jitter for better visibility
+    data = paired_data(feeling, x_metric, y_metric).get(selected_group)
+
+    if data:
+        n_points = len(data['detail_x'])
+        scatter = go.Scattergl if n_points > WEBGL_THRESHOLD else go.Scatter
+
         fig.add_trace(
-            go.Scatter(
+            scatter(
                 x=data['detail_x'],
                 y=data['detail_y'],
-                mode='markers',
-                marker=dict(
-                    size=10,
-                    color=data['color'],
-                    opacity=0.6,
-                    line=dict(width=1, color='white')
-                ),
-                name=f'{selected_group} Data Points',
-                hovertemplate=f"<b>{selected_group}</b><br>" +
-                            "X: %{x:.2f}<br>" +
-                            "Y: %{y:.2f}<extra></extra>"
-            )
-        )
-        
-        # Add center point
-        center_x, center_y = data['center']
-        fig.add_trace(
-            go.Scatter(
-                x=[center_x],
-                y=[center_y],
                 mode='markers+text',
                 marker=dict(
-                    size=30,
-                    color='gold',
-                    opacity=1.0,
-                    line=dict(width=3, color=data['color']),
-                    symbol='star'
+                    size=data['detail_size'],
+                    color=data['detail_color'],
+                    opacity=1,
+                    line=dict(width=1, color='#DBDBDB')
                 ),
-                text=['⭐ CENTER'],
-                textposition="top center",
-                textfont=dict(color=data['color'], size=14, family="Arial Black"),
-                name='Group Center'
+                text=data['detail_names'],
+                textposition="bottom center",
+                textfont=dict(color='#808080', size=10, family="Arial Black"),
+                customdata=data['detail_choice'],
+                name=f'{selected_group} Shades',
+                hovertemplate="<b>%{text}</b><br>" +
+                            "X: %{x:.2f}<br>" +
+                            "Y: %{y:.2f}<br>" +
+                            "Clicks: %{customdata}<extra></extra>"
             )
         )
-        
+
         fig.update_layout(
             title={
-                'text': f"🔍 {selected_group} Deep Dive ({data['size']} points)",
+                'text': f"🔍 {selected_group} Deep Dive ({n_points} shades) - {feeling}",
                 'x': 0.5,
                 'xanchor': 'center',
-                'font': {'size': 20, 'color': data['color']}
+                'font': {'size': 20, 'color': '#2649B2'}
             },
-            xaxis_title="Detailed X Coordinate",
-            yaxis_title="Detailed Y Coordinate",
+            xaxis=dict(title=x_metric, gridcolor='rgba(38,73,178,0.1)'),
+            yaxis=dict(title=y_metric, gridcolor='rgba(38,73,178,0.1)'),
             height=600,
             showlegend=False,
-            plot_bgcolor='rgba(248,249,250,0.8)'
+            plot_bgcolor='#DBDBDB'
         )
-    
+
     return fig
 
-# Same app layout and callbacks as before...
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def figure_json(feeling, x_metric, y_metric, group=None):
+    """
+    Figure of a view as a plain dict (overview when group is None), built once per (feeling, X, Y, group):
+    navigating back to a view returns the cached figure without rebuilding it
+    """
+    if group is None:
+        fig = create_overview_plot(feeling, x_metric, y_metric)
+    else:
+        fig = create_detail_plot(feeling, x_metric, y_metric, group)
+    return fig.to_plotly_json()
+
+def dropdown(id, label, options, value):
+    return html.Div([
+        html.Label(label, style={'fontWeight': 'bold', 'color': '#2649B2'}),
+        dcc.Dropdown(id=id, options=options, value=value, clearable=False, style={'width': '360px'})
+    ], style={'display': 'inline-block', 'margin': '0 10px'})
+
 app = dash.Dash(__name__)
 
 app.layout = html.Div([
     html.Div([
-        html.H1("🚀 Interactive Nested Scatter Plot", 
+        html.H1("🚀 Emotion to Color Explorer",
                 style={'textAlign': 'center', 'color': '#2649B2', 'marginBottom': '10px'})
     ]),
-    
+
+    html.Div([
+        dropdown('feeling', "🎭 Feeling", feelings, feelings[0]),
+        dropdown('x-metric', "↔️ X axis", metrics, default_x),
+        dropdown('y-metric', "↕️ Y axis", metrics, default_y)
+    ], style={'textAlign': 'center', 'marginBottom': '15px'}),
+
     html.Div([
         html.Button(
-            '⬅️ Back to Overview', 
+            '⬅️ Back to Overview',
             id='back-button',
             className='back-btn',
-            style={
-                'backgroundColor': '#2649B2',
-                'color': 'white',
-                'border': 'none',
-                'padding': '12px 24px',
-                'fontSize': '16px',
-                'borderRadius': '25px',
-                'cursor': 'pointer',
-                'marginBottom': '15px',
-                'display': 'none',
-                'boxShadow': '0 4px 8px rgba(0,0,0,0.1)',
-                'transition': 'all 0.3s ease'
-            }
+            style=dict(BUTTON_STYLE, display='none')
         )
     ], style={'textAlign': 'center'}),
-    
+
     html.Div([
         dcc.Graph(
             id='main-graph',
-            figure=create_overview_plot(),
+            figure=figure_json(feelings[0], default_x, default_y),
             style={'height': '600px'}
         )
     ]),
-    
+
     dcc.Store(id='current-view', data='overview'),
     dcc.Store(id='selected-group', data=None)
 ])
 
-# Same callback as before...
 @app.callback(
     [Output('main-graph', 'figure'),
      Output('current-view', 'data'),
      Output('selected-group', 'data'),
      Output('back-button', 'style')],
     [Input('main-graph', 'clickData'),
-     Input('back-button', 'n_clicks')],
+     Input('back-button', 'n_clicks'),
+     Input('feeling', 'value'),
+     Input('x-metric', 'value'),
+     Input('y-metric', 'value')],
     [State('current-view', 'data'),
      State('selected-group', 'data')]
 )
-def update_plot(clickData, back_clicks, current_view, selected_group):
+def update_plot(clickData, back_clicks, feeling, x_metric, y_metric, current_view, selected_group):
     ctx = dash.callback_context
-    if not ctx.triggered:
-        return (create_overview_plot(), 'overview', None, 
-                {'backgroundColor': '#2649B2', 'color': 'white', 'border': 'none',
-                 'padding': '12px 24px', 'fontSize': '16px', 'borderRadius': '25px',
-                 'cursor': 'pointer', 'marginBottom': '15px', 'display': 'none',
-                 'boxShadow': '0 4px 8px rgba(0,0,0,0.1)'})
-    
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    
-    if trigger_id == 'back-button' and back_clicks:
-        return (create_overview_plot(), 'overview', None,
-                {'backgroundColor': '#2649B2', 'color': 'white', 'border': 'none',
-                 'padding': '12px 24px', 'fontSize': '16px', 'borderRadius': '25px',
-                 'cursor': 'pointer', 'marginBottom': '15px', 'display': 'none',
-                 'boxShadow': '0 4px 8px rgba(0,0,0,0.1)'})
-    
-    elif trigger_id == 'main-graph' and clickData and current_view == 'overview':
+    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
+
+    if trigger_id == 'main-graph' and clickData and current_view == 'overview':
         if 'points' in clickData and len(clickData['points']) > 0:
-            clicked_group = clickData['points'][0]['customdata']
-            
-            return (create_detail_plot(clicked_group), 'detail', clicked_group,
-                    {'backgroundColor': '#2649B2', 'color': 'white', 'border': 'none',
-                     'padding': '12px 24px', 'fontSize': '16px', 'borderRadius': '25px',
-                     'cursor': 'pointer', 'marginBottom': '15px', 'display': 'block',
-                     'boxShadow': '0 4px 8px rgba(0,0,0,0.1)'})
-    
-    return (dash.no_update, dash.no_update, dash.no_update, dash.no_update)
+            selected_group = clickData['points'][0]['customdata']
+            current_view = 'detail'
+        else:
+            return (dash.no_update, dash.no_update, dash.no_update, dash.no_update)
+    elif trigger_id == 'main-graph':
+        return (dash.no_update, dash.no_update, dash.no_update, dash.no_update)
+    elif trigger_id == 'back-button' or trigger_id is None:
+        current_view, selected_group = 'overview', None
+
+    # A new feeling / metric pair keeps the detail view when the colour family still has points
+    if current_view == 'detail' and selected_group in paired_data(feeling, x_metric, y_metric):
+        return (figure_json(feeling, x_metric, y_metric, selected_group), 'detail', selected_group,
+                dict(BUTTON_STYLE, display='block'))
+
+    return (figure_json(feeling, x_metric, y_metric), 'overview', None, dict(BUTTON_STYLE, display='none'))
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=DEBUG)
@@ -0,0 +1,153 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import numpy as np
+import pathlib
+
+from et_dataset import load_et, annotate_labels
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+col_fix = "Fixation count"
+col_dur = "Duration of average fixation"
+col_ttff = "TTFF (AOI)"
+col_clicks_resp = "Respondent count (mouse clicks)"
+col_clicks = "Mouse click count"
+col_survey = "count" # Nombre de fois où la shade a été choisie dans le survey (même nom que dans fixations_by_shade.xlsx)
+
+METRICS = [col_fix, col_dur, col_ttff, col_clicks_resp, col_clicks]
+
+# Un TTFF faible veut dire que la shade attire l'oeil plus vite: son z-score est inversé
+INVERTED = [f"Somme de {col_ttff}", f"Moyenne de {col_ttff}"]
+
+DEFAULT_WEIGHTS = {
+    f"Moyenne de {col_fix}": 1.0,
+    f"Moyenne de {col_dur}": 1.0,
+    f"Moyenne de {col_ttff}": 1.0,
+    f"Somme de {col_clicks}": 1.0,
+    col_survey: 2.0,
+}
+
+LEVELS = {
+    "shade": ["Shade"],
+    "feeling_shade": ["Feeling", "Shade"],
+}
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def _accumulate(total, new):
+    """Add the sums of a new batch to the running totals (groups seen in only one of them are kept)"""
+    return new if total is None else total.add(new, fill_value=0)
+
+
+#%%
+####################################################################################################################################
+# CLASSES
+####################################################################################################################################
+
+class ShadeAttractivenessScorer:
+    """
+        Composite attractiveness index per shade and per (feeling, shade).
+        Sums and counts are accumulated so new respondents only update the groups they touch, and the z-normalized
+        columns are cached so changing the weights is a single matrix-vector product.
+    """
+    def __init__(self, metrics=METRICS, weights=None, inverted=INVERTED):
+        self.metrics = metrics
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.inverted = inverted
+
+        self._sums = dict.fromkeys(LEVELS)
+        self._counts = dict.fromkeys(LEVELS)
+        self._survey = dict.fromkeys(LEVELS)
+        self._normalized = {}
+
+    def update(self, et_rows, survey=None):
+        """
+            Add new rows: et_rows are P2d rows annotated by et_dataset.annotate_labels, survey is the matching part of
+            the "Full Survey Response" sheet (Word_EmotionOrBenefit, OA Name).
+        """
+        et_rows = et_rows.loc[et_rows["Phase"] == "P2d"]
+        for level, keys in LEVELS.items():
+            grouped = et_rows.groupby(keys)[self.metrics]
+            self._sums[level] = _accumulate(self._sums[level], grouped.sum())
+            self._counts[level] = _accumulate(self._counts[level], grouped.count())
+
+            if survey is not None:
+                answers = survey.rename(columns={"Word_EmotionOrBenefit": "Feeling", "OA Name": "Shade"})
+                self._survey[level] = _accumulate(self._survey[level], answers.groupby(keys).size())
+
+        # Seules les colonnes normalisées doivent être recalculées
+        self._normalized.clear()
+
+    def metrics_table(self, level="shade"):
+        """Somme / Moyenne columns, same layout as fixations_by_shade.xlsx"""
+        sums = self._sums[level]
+        means = sums / self._counts[level].replace(0, np.nan)
+        table = pd.concat([sums.add_prefix("Somme de "), means.add_prefix("Moyenne de ")], axis=1)
+        survey = self._survey[level]
+        table[col_survey] = 0.0 if survey is None else survey.reindex(table.index).fillna(0)
+        return table
+
+    def normalized(self, level="shade"):
+        """z-scores of every column of metrics_table (TTFF inverted), cached until the next update"""
+        if level not in self._normalized:
+            table = self.metrics_table(level)
+            std = table.std(ddof=0).replace(0, np.nan)
+            z = ((table - table.mean()) / std).fillna(0)
+            inverted = [col for col in self.inverted if col in z.columns]
+            z[inverted] = -z[inverted]
+            self._normalized[level] = z
+        return self._normalized[level]
+
+    def set_weights(self, weights):
+        self.weights = dict(weights)
+
+    def rank(self, level="shade", weights=None):
+        """Weighted index from the cached z-scores, best shades first"""
+        weights = self.weights if weights is None else weights
+        z = self.normalized(level)
+        w = pd.Series(weights, dtype=float).reindex(z.columns).fillna(0)
+        total = w.abs().sum()
+
+        index = z.to_numpy() @ w.to_numpy() / (total if total else 1)
+        res = pd.DataFrame({"Attractiveness": index}, index=z.index)
+
+        if level == "feeling_shade":
+            res["Rank"] = res.groupby(level="Feeling")["Attractiveness"].rank(ascending=False, method="min").astype(int)
+            return res.sort_values(["Feeling", "Rank"])
+
+        res["Rank"] = res["Attractiveness"].rank(ascending=False, method="min").astype(int)
+        return res.sort_values("Rank")
+
+
+#%%
+####################################################################################################################################
+# MAIN
+####################################################################################################################################
+
+def main():
+    parent_path = pathlib.Path(__file__).parent.parent # Chemin parent du dossier (Emoskin)
+    et = annotate_labels(load_et(parent_path))
+    survey = pd.read_excel(parent_path / "Files" / "survey.xlsx", sheet_name="Full Survey Response")
+
+    scorer = ShadeAttractivenessScorer()
+    scorer.update(et.dropna(subset=["Feeling"]), survey)
+
+    res_path = parent_path / "Results"
+    res_path.mkdir(parents=True, exist_ok=True)
+    with pd.ExcelWriter(res_path / "attractiveness_by_shade.xlsx") as writer:
+        scorer.rank("shade").join(scorer.metrics_table("shade")).to_excel(writer, sheet_name="Shades")
+        scorer.rank("feeling_shade").join(scorer.metrics_table("feeling_shade")).to_excel(writer, sheet_name="Feelings x Shades")
+
+
+if __name__ == "__main__":
+    main()
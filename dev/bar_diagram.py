@@ -1,9 +1,15 @@
 import numpy as np
+import matplotlib
+matplotlib.use("Agg") # Rendu sans fenêtre: les figures ne sont qu'enregistrées en PNG
 import matplotlib.pyplot as plt
 import pandas as pd
 import re
+import os
 import pathlib
 import natsort
+from concurrent.futures import ProcessPoolExecutor
+
+from build_manifest import BuildManifest, content_hash
 
 parent_path = pathlib.Path(__file__).parent.parent
 
@@ -17,27 +23,67 @@ names = ["Happy_Yellows.xlsx", "Happy_Reds.xlsx", "Relaxed_Blues.xlsx", "Relaxed
  "Softening_Yellows.xlsx", "Glowing_Yellows.xlsx", "Glowing_Oranges.xlsx"]
 criteres = ["Fixation count", "Duration of average fixation", "TTFF (AOI)", "Dwell time (fixation, ms)"]
 
-hex = pd.read_excel(parent_path / "Files" / "code_hex.xlsx", sheet_name="Données Complètes palettes", index_col="Nom Teinte")
-
 res_path = parent_path / "Results" / "Shades_by_emotion"
 
-for name in names:
-    name_split = re.split(r"[_.]", name)
-    print(f"{name_split[0]}_{name_split[1]}")
+# Nombre de processus pour le rendu (None = un par coeur, 1 = séquentiel)
+N_WORKERS = None
+
+# Passer à True pour redessiner tous les graphiques, même ceux dont les données n'ont pas changé
+FORCE_REBUILD = False
+
+# Table des HEX, manifeste de build et figure réutilisée, propres à chaque processus
+_HEX = None
+_MANIFEST = None
+_FIGURE = None
+
 
+def init_worker(hex, manifest=None):
+    global _HEX, _MANIFEST
+    _HEX = hex
+    _MANIFEST = manifest
+
+
+def get_figure():
+    """Figure 18x9 créée une fois par processus puis vidée entre deux graphiques"""
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE, ax = plt.subplots()
+        _FIGURE.set_figheight(9)
+        _FIGURE.set_figwidth(18)      # fig.set_facecolor("#A6A6A6")
+    ax = _FIGURE.axes[0]
+    ax.clear()
+    return _FIGURE, ax
+
+
+def prepare_file(name, hex):
+    """Lecture d'un fichier, ordre naturel des shades et couleurs HEX: fait une seule fois pour tous les critères"""
     data = pd.read_excel(res_path / name, index_col="Label_modified")
     # data = data.sort_index(ascending=True)
     data = data.reindex(natsort.natsorted(data.index))
     hex_bis = hex[hex.index.isin(data.index)]
     hex_bis = hex_bis.reindex(data.index)
     colors = hex_bis["HEX"].tolist()
-    
+    return data, colors
+
+
+def render_file(name):
+    """
+        Les graphiques des 4 critères d'un fichier, renvoie les chemins des PNG et le hash des données utilisées.
+        Rien n'est redessiné si le manifeste a déjà ces PNG pour le même hash.
+    """
+    name_split = re.split(r"[_.]", name)
+    data, colors = prepare_file(name, _HEX)
+
+    digest = content_hash(data, colors, criteres)
+    key = f"bar_diagram/{name}"
+    if _MANIFEST is not None and _MANIFEST.is_fresh(key, digest):
+        return _MANIFEST.files(key), digest, False
+
+    saved = []
     for critere in criteres:
         res_path_bis = res_path / critere
         res_path_bis.mkdir(parents=True, exist_ok=True)
-        fig, ax = plt.subplots()
-        fig.set_figheight(9)
-        fig.set_figwidth(18)      # fig.set_facecolor("#A6A6A6")
+        fig, ax = get_figure()
         ax.bar(data.index, data[critere], color=colors)
         ax.set_title(f"{critere} for {name_split[0]} {name_split[1]}", fontsize=24)
         ax.set_xlabel(f"{name_split[1]}", fontsize=16)
@@ -46,7 +92,40 @@ for name in names:
             label.set_fontsize(14)
             label.set_fontstretch("ultra-condensed")
         # ax.set_facecolor("#A6A6A6")
-        plt.tight_layout()
-        plt.show()
-        plt.savefig(res_path_bis / f"{name_split[0]}_{name_split[1]}.png")
-        plt.close()
\ No newline at end of file
+        fig.tight_layout()
+        png = res_path_bis / f"{name_split[0]}_{name_split[1]}.png"
+        fig.savefig(png)
+        saved.append(png)
+    return saved, digest, True
+
+
+def render_all(names, hex, n_workers=None, manifest=None):
+    """
+        Rendu de tous les fichiers, répartis sur un pool de processus (la table HEX et le manifeste sont envoyés une fois
+        par processus). Renvoie {nom: (PNG, redessiné ou non)} et met à jour le manifeste.
+    """
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    if n_workers <= 1:
+        init_worker(hex, manifest)
+        results = [render_file(name) for name in names]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker, initargs=(hex, manifest)) as pool:
+            results = list(pool.map(render_file, names))
+
+    if manifest is not None:
+        for name, (files, digest, rebuilt) in zip(names, results):
+            if rebuilt:
+                manifest.record(f"bar_diagram/{name}", digest, files)
+    return {name: (files, rebuilt) for name, (files, digest, rebuilt) in zip(names, results)}
+
+
+if __name__ == "__main__":
+    hex = pd.read_excel(parent_path / "Files" / "code_hex.xlsx", sheet_name="Données Complètes palettes", index_col="Nom Teinte")
+
+    manifest = BuildManifest(parent_path / "Results" / "build_manifest.json", force=FORCE_REBUILD)
+
+    saved = render_all(names, hex, N_WORKERS, manifest)
+    manifest.save()
+    for name, (files, rebuilt) in saved.items():
+        name_split = re.split(r"[_.]", name)
+        print(f"{name_split[0]}_{name_split[1]}: {len(files)} graphiques" + ("" if rebuilt else " (à jour)"))
@@ -6,16 +6,55 @@ import pathlib
 import json
 from itertools import product
 import re
-import sys
+import tracemalloc
+import gzip
+import hashlib
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from payload_encoding import encode_payload, JS_DECODER
+from et_dataset import group_codes, group_details
+from html_template import StreamingTemplate, json_object_chunks
+from memory_report import deep_sizeof, track_phase, report_frame, MB
+from static_assets import build_static_manifest, compression_summary
+
+# Page skeleton (CSS + JS), split once into literal parts and {{ name }} slots
+PAGE_TEMPLATE = StreamingTemplate("bubbles_diagram.html")
+
+# Shades without HEX code, and rows whose shade is not in the shade table (detail_shade = -1, e.g. a missing label)
+MISSING_SHADE_COLOR = "#CCCCCC"
+MISSING_SHADE = -1
+
+# Analyzer read by the worker processes: inherited through fork (copy-on-write), never pickled
+_WORKER_ANALYZER = None
+
+def _process_feeling_worker(feeling):
+    """
+    Columnar payload of one feeling, run in a worker process. The base data (DataFrames) stays in the worker: only the
+    payload (lists of numbers) is pickled back to the parent
+    """
+    try:
+        base_data = _WORKER_ANALYZER.process_base_feeling(feeling)
+        return feeling, _WORKER_ANALYZER.process_feeling(feeling, base_data), None
+    except Exception as e:
+        return feeling, None, str(e)
 
 class PreprocessedFlexibleFeelingsAnalyzer:
-    def __init__(self):
+    def __init__(self, n_workers=None, profile_memory=False, sort_by_size=False):
+        # Duration (and tracemalloc peak with profile_memory) of each pre-processing phase, see memory_report()
+        self.memory_phases = {}
+        started_tracing = profile_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        
         # Data loading
         parent_path = pathlib.Path(__file__).parent.parent
-        self.df = pd.read_excel(parent_path / "Results" / "Tableaux" / "Feelings" / "Feelings.xlsx", index_col=[0, 1])
-        self.et = pd.read_excel(parent_path / "Files" / "ET_modified.xlsx", usecols="B:C, F:L, P:AO, AQ:AW, BC: BE", skiprows=6)
-        self.hex = pd.read_excel(parent_path / "Files" / "code_hex.xlsx", sheet_name="Données Complètes palettes", index_col="Nom Teinte")
-        self.survey = pd.read_excel(parent_path / "Files" / "survey.xlsx", sheet_name="Full Survey Response", index_col="OA Name")
+        with track_phase(self.memory_phases, "loading"):
+            self.df = pd.read_excel(parent_path / "Results" / "Tableaux" / "Feelings" / "Feelings.xlsx", index_col=[0, 1])
+            self.et = pd.read_excel(parent_path / "Files" / "ET_modified.xlsx", usecols="B:C, F:L, P:AO, AQ:AW, BC: BE", skiprows=6)
+            self.hex = pd.read_excel(parent_path / "Files" / "code_hex.xlsx", sheet_name="Données Complètes palettes", index_col="Nom Teinte")
+            self.survey = pd.read_excel(parent_path / "Files" / "survey.xlsx", sheet_name="Full Survey Response", index_col="OA Name")
         
         # Filter ET data
         self.et_p2d = self.et.loc[self.et.loc[:, "Parent Label"].str.contains("P2d", na=False), :]
@@ -25,16 +64,43 @@ class PreprocessedFlexibleFeelingsAnalyzer:
         self.colors = ["Reds", "Greens", "Oranges", "Yellows", "Whites", "Lavenders", "Blues"]
         self.codes_hex = ["#EDCCD5", "#C3E9CB", "#F7D0B7", "#FFEEC4", "#F9F9FA", "#D9C8E5", "#C0E3F6"]
         
+        # Embedded data: numeric columns packed as base64 typed arrays, rounded to the 2 decimals shown in the hovers
+        self.typed_arrays = True
+        self.plot_precision = 2
+        
+        # Number of points above which the detail view switches to WebGL (scattergl)
+        self.webgl_threshold = 1000
+        
+        # Draw order precomputed in the payload (opt-in, used by the _temp page): biggest groups / shades first so the small
+        # bubbles stay visible. Off by default: the main page keeps the data order
+        self.sort_by_size = sort_by_size
+        
         # Get available metrics from the data
         self.available_metrics = self.get_available_metrics()
         
+        # Shared shade table (name + HEX), referenced by integer IDs in the feelings payloads
+        self.shade_names = pd.Index([])
+        self.shade_colors = []
+        with track_phase(self.memory_phases, "shade_table"):
+            self.build_shade_table()
+        
         # Store base data for processing
         self.base_feelings_data = {}
-        self.process_base_data()
         
-        # 🚀 Pre-process ALL metric combinations
-        self.all_combinations_data = {}
-        self.preprocess_all_combinations()
+        # 🚀 Pre-process every feeling (one column per metric)
+        self.all_feelings_data = {}
+        
+        try:
+            if n_workers is not None and n_workers > 1:
+                self.preprocess_parallel(n_workers)
+            else:
+                with track_phase(self.memory_phases, "base_data"):
+                    self.process_base_data()
+                with track_phase(self.memory_phases, "payloads"):
+                    self.preprocess_all_feelings()
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
     
 
     def get_available_metrics(self):
@@ -61,168 +127,243 @@ class PreprocessedFlexibleFeelingsAnalyzer:
         
         for feeling in self.feelings:
             try:
-                df_feeling = self.df.loc[feeling, :]
-                et_p2d_feelings = self.et_p2d.loc[self.et_p2d.loc[:, "Parent Label"].str.contains(feeling), :]
-                et_p2d_feelings.loc[:, "Label_modified"] = et_p2d_feelings["Label_modified"].str.split("_").str[-1]
-                et_p2d_feelings = et_p2d_feelings.set_index("Label_modified")
-                choice = self.survey.loc[self.survey["Word_EmotionOrBenefit"] == feeling, :]
-                
-                # Add hex codes to color families
-                for i, color in enumerate(self.colors):
-                    if color in df_feeling.index:
-                        df_feeling.loc[color, "Code_hex"] = self.codes_hex[i]
-                
-                self.base_feelings_data[feeling] = {
-                    'df_feeling': df_feeling,
-                    'et_p2d_feelings': et_p2d_feelings,
-                    'choice': choice
-                }
+                self.base_feelings_data[feeling] = self.process_base_feeling(feeling)
                 print(f"✅ Processed base data for: {feeling}")
             except Exception as e:
                 print(f"❌ Error processing {feeling}: {e}")
     
+    def process_base_feeling(self, feeling):
+        """Base data (without specific metrics) of one feeling"""
+        df_feeling = self.df.loc[feeling, :]
+        et_p2d_feelings = self.et_p2d.loc[self.et_p2d.loc[:, "Parent Label"].str.contains(feeling), :]
+        et_p2d_feelings.loc[:, "Label_modified"] = et_p2d_feelings["Label_modified"].str.split("_").str[-1]
+        et_p2d_feelings = et_p2d_feelings.set_index("Label_modified")
+        choice = self.survey.loc[self.survey["Word_EmotionOrBenefit"] == feeling, :]
+        
+        # Add hex codes to color families
+        for i, color in enumerate(self.colors):
+            if color in df_feeling.index:
+                df_feeling.loc[color, "Code_hex"] = self.codes_hex[i]
+        
+        return {
+            'df_feeling': df_feeling,
+            'et_p2d_feelings': et_p2d_feelings,
+            'choice': choice,
+            # Colour family of each ET row (position in df_feeling.index), computed once
+            'group_code': group_codes(et_p2d_feelings["Parent Label"], df_feeling.index)
+        }
+    
+    def build_shade_table(self):
+        """Look up the HEX code of every shade of the study once"""
+        names = self.et_p2d["Label_modified"].dropna().str.split("_").str[-1].unique()
+        
+        self.shade_names = pd.Index(sorted(names))
+        hex_shades = self.hex[~self.hex.index.duplicated()].reindex(self.shade_names)
+        self.shade_colors = hex_shades["HEX"].fillna(MISSING_SHADE_COLOR).tolist()  # Default color for missing
+        print(f"🎨 Shade table: {len(self.shade_names)} shades")
+    
+    def _column(self, values):
+        """List of floats for the JSON payload (NaN -> null)"""
+        return [None if pd.isna(v) else float(v) for v in values]
+    
+    def process_feeling(self, feeling, base_data=None):
+        """Build the columnar payload of one feeling: one vector per metric + shade IDs and clicks shared by all metrics"""
+        if base_data is None:
+            if feeling not in self.base_feelings_data:
+                return None
+            base_data = self.base_feelings_data[feeling]
+        
+        df_feeling = base_data['df_feeling']
+        et_p2d_feelings = base_data['et_p2d_feelings']
+        choice = base_data['choice']
+        
+        # All the groups at once: rows sorted by group, clicks per shade (groups without shade are skipped)
+        details = group_details(et_p2d_feelings.index, base_data['group_code'], df_feeling.index, choice,
+                                sort_by_size=self.sort_by_size)
+        groups = details['groups']
+        rows = details['rows']
+        
+        centers = {}
+        columns = {}
+        for metric in self.available_metrics:
+            center_values = df_feeling.loc[groups, metric].to_numpy(dtype=float)
+            centers[metric] = self._column(center_values)
+            
+            # For detail view, get actual metric values (null column = use the center of the group)
+            if metric in et_p2d_feelings.columns:
+                columns[metric] = self._column(et_p2d_feelings[metric].to_numpy(dtype=float)[rows])
+            else:
+                columns[metric] = None
+        
+        return {
+            'groups': groups,
+            'group_color': df_feeling.loc[groups, "Code_hex"].tolist(),
+            'group_offsets': details['offsets'],
+            # Position of each row in the shade table, MISSING_SHADE (-1) when its label is missing / unknown
+            'detail_shade': self.shade_names.get_indexer(details['names']).tolist(),
+            'detail_choice': details['clicks'].tolist(),
+            'centers': centers,
+            'columns': columns
+        }
+    
     def process_feeling_with_metrics(self, feeling, x_metric, y_metric):
-        """Process data for a specific feeling with specified X and Y metrics"""
-        if feeling not in self.base_feelings_data:
+        """Pair two metric columns of a feeling (same output as the per-combination version, built from the columnar payload)"""
+        payload = self.all_feelings_data.get(feeling)
+        if not payload:
             return None, 0
         
-        try:
-            base_data = self.base_feelings_data[feeling]
-            df_feeling = base_data['df_feeling']
-            et_p2d_feelings = base_data['et_p2d_feelings']
-            choice = base_data['choice']
+        all_data = {}
+        max_clicks_found = 0
+        offsets = payload['group_offsets']
+        
+        for i, group in enumerate(payload['groups']):
+            center_x = payload['centers'][x_metric][i]
+            center_y = payload['centers'][y_metric][i]
             
-            groups = df_feeling.index
-            all_data = {}
-            max_clicks_found = 0
+            # Skip if values are NaN
+            if center_x is None or center_y is None:
+                continue
             
-            for group in groups:
-                try:
-                    # ✅ Use the ACTUAL selected metrics
-                    center_x = df_feeling.loc[group, x_metric]
-                    center_y = df_feeling.loc[group, y_metric]
-                    
-                    # Skip if values are NaN
-                    if pd.isna(center_x) or pd.isna(center_y):
-                        continue
-                        
-                except (KeyError, IndexError):
-                    print(f"⚠️ Metric not found for {group}: {x_metric} or {y_metric}")
-                    continue
-                
-                group_data = et_p2d_feelings.loc[et_p2d_feelings.loc[:, "Parent Label"].str.contains(group), :]
-                
-                # For detail view, get actual metric values
-                if x_metric in et_p2d_feelings.columns:
-                    detail_x = et_p2d_feelings.loc[et_p2d_feelings.loc[:, "Parent Label"].str.contains(group), x_metric]
-                    detail_x = detail_x.dropna()  # Remove NaN values
-                else:
-                    detail_x = pd.Series([center_x] * len(group_data), index=group_data.index)
-                
-                if y_metric in et_p2d_feelings.columns:
-                    detail_y = et_p2d_feelings.loc[et_p2d_feelings.loc[:, "Parent Label"].str.contains(group), y_metric]
-                    detail_y = detail_y.dropna()  # Remove NaN values
-                else:
-                    detail_y = pd.Series([center_y] * len(group_data), index=group_data.index)
-                
-                # Align detail_x and detail_y indices
-                common_indices = detail_x.index.intersection(detail_y.index)
-                detail_x = detail_x.loc[common_indices]
-                detail_y = detail_y.loc[common_indices]
-                
-                if len(detail_x) == 0:  # Skip if no valid data
-                    continue
-                
-                # Process clicks and colors
-                choice_group = choice[choice.index.isin(common_indices)]
-                choice_group = choice_group.index.value_counts()
-                tot_choice = int(choice_group.sum()) if not choice_group.empty else 0
-                
-                hex_group = self.hex[self.hex.index.isin(common_indices)]
-                hex_group = hex_group.reindex(common_indices)
-                choice_group = choice_group.reindex(common_indices)
-                
-                if not choice_group.empty:
-                    max_clicks_in_group = choice_group.max() if choice_group.notna().any() else 0
-                    max_clicks_found = max(max_clicks_found, max_clicks_in_group)
-                
-                choice_group[choice_group.isna()] = 0
-                detail_choice = choice_group.tolist()
-                choice_group = choice_group + 1
-                detail_size = (choice_group*10).tolist()
-                
-                group_colors_shades = hex_group["HEX"].fillna("#CCCCCC").tolist()  # Default color for missing
-                detail_names = common_indices.tolist()
-                
-                all_data[group] = {
-                    'center_x': float(center_x),
-                    'center_y': float(center_y),
-                    'color': df_feeling.loc[group, "Code_hex"],
-                    'detail_x': detail_x.tolist(),
-                    'detail_y': detail_y.tolist(),
-                    'detail_color': group_colors_shades,
-                    'detail_size': detail_size,
-                    'detail_choice': detail_choice,
-                    'detail_names': detail_names,
-                    'marker_size': int(tot_choice * 10) if tot_choice > 0 else 10,
-                    'choice': tot_choice
-                }
+            shades = range(offsets[i], offsets[i + 1])
+            column_x = payload['columns'][x_metric]
+            column_y = payload['columns'][y_metric]
+            detail_x = [center_x] * len(shades) if column_x is None else [column_x[j] for j in shades]
+            detail_y = [center_y] * len(shades) if column_y is None else [column_y[j] for j in shades]
+            
+            # Align detail_x and detail_y (keep shades where both values exist)
+            kept = [k for k, j in enumerate(shades) if detail_x[k] is not None and detail_y[k] is not None]
+            if len(kept) == 0:  # Skip if no valid data
+                continue
             
-            return all_data, max_clicks_found
+            detail_choice = [payload['detail_choice'][shades[k]] for k in kept]
+            detail_shade = [payload['detail_shade'][shades[k]] for k in kept]
+            tot_choice = sum(detail_choice)
+            max_clicks_found = max([max_clicks_found] + detail_choice)
             
-        except Exception as e:
-            print(f"❌ Error processing {feeling} with {x_metric} vs {y_metric}: {e}")
-            return {}, 0
+            all_data[group] = {
+                'center_x': center_x,
+                'center_y': center_y,
+                'color': payload['group_color'][i],
+                'detail_x': [detail_x[k] for k in kept],
+                'detail_y': [detail_y[k] for k in kept],
+                'detail_color': [self.shade_colors[j] if j != MISSING_SHADE else MISSING_SHADE_COLOR for j in detail_shade],
+                'detail_size': [(clicks + 1) * 10 for clicks in detail_choice],
+                'detail_choice': detail_choice,
+                'detail_names': [self.shade_names[j] if j != MISSING_SHADE else "" for j in detail_shade],
+                'marker_size': int(tot_choice * 10) if tot_choice > 0 else 10,
+                'choice': tot_choice
+            }
+        
+        return all_data, max_clicks_found
     
-    def preprocess_all_combinations(self):
-        """🚀 Pre-process ALL possible combinations of feelings and metrics"""
-        total_combinations = len(self.feelings) * len(self.available_metrics) * len(self.available_metrics)
-        print(f"\n🚀 Pre-processing {total_combinations:,} metric combinations...")
-        print(f"   📊 {len(self.feelings)} feelings")
-        print(f"   ↔️ {len(self.available_metrics)} X-axis metrics") 
-        print(f"   ↕️ {len(self.available_metrics)} Y-axis metrics")
-        print(f"   ⏱️ This may take a few minutes...")
-        
-        processed_count = 0
+    def preprocess_all_feelings(self):
+        """🚀 Pre-process every feeling once: the (X, Y) pairing is done at view time"""
+        print(f"\n🚀 Pre-processing {len(self.feelings)} feelings x {len(self.available_metrics)} metric columns...")
         
         for feeling in self.feelings:
-            self.all_combinations_data[feeling] = {}
-            
-            for x_metric in self.available_metrics:
-                self.all_combinations_data[feeling][x_metric] = {}
-                
-                for y_metric in self.available_metrics:
-                    try:
-                        data, max_clicks = self.process_feeling_with_metrics(feeling, x_metric, y_metric)
-                        self.all_combinations_data[feeling][x_metric][y_metric] = {
-                            'data': data,
-                            'max_clicks': max_clicks
-                        }
-                        processed_count += 1
-                        
-                        # Progress indicator
-                        if processed_count % 50 == 0:
-                            progress = (processed_count / total_combinations) * 100
-                            print(f"   ⏳ Progress: {processed_count:,}/{total_combinations:,} ({progress:.1f}%)")
-                            
-                    except Exception as e:
-                        print(f"❌ Error processing {feeling} - {x_metric} vs {y_metric}: {e}")
-                        self.all_combinations_data[feeling][x_metric][y_metric] = {
-                            'data': {},
-                            'max_clicks': 0
-                        }
-        
-        print(f"✅ Successfully pre-processed {processed_count:,} combinations!")
+            try:
+                payload = self.process_feeling(feeling)
+                if payload is not None:
+                    self.all_feelings_data[feeling] = payload
+            except Exception as e:
+                print(f"❌ Error processing {feeling}: {e}")
+        
+        print(f"✅ Successfully pre-processed {len(self.all_feelings_data)} feelings!")
+        print(f"💾 Memory usage: ~{self.estimate_memory_usage()} MB")
+    
+    def preprocess_parallel(self, n_workers):
+        """
+        Payload of each feeling in a pool of worker processes.
+        The ET / hex / survey frames are shared through fork, results are merged in the order of self.feelings.
+        The base data is not sent back (base_feelings_data stays empty): the payloads are all the page and the pairing need.
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            print("⚠️ fork is not available on this platform, falling back to sequential processing")
+            self.process_base_data()
+            self.preprocess_all_feelings()
+            return
+        
+        global _WORKER_ANALYZER
+        print(f"\n🚀 Pre-processing {len(self.feelings)} feelings on {n_workers} worker processes...")
+        
+        _WORKER_ANALYZER = self
+        try:
+            # tracemalloc only sees this process: the peak is the one of the merged results, not of the workers
+            with track_phase(self.memory_phases, "parallel"), \
+                 ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                for feeling, payload, error in pool.map(_process_feeling_worker, self.feelings):
+                    if error is not None:
+                        print(f"❌ Error processing {feeling}: {error}")
+                        continue
+                    if payload is not None:
+                        self.all_feelings_data[feeling] = payload
+                    print(f"✅ Processed: {feeling}")
+        finally:
+            _WORKER_ANALYZER = None
+        
+        print(f"✅ Successfully pre-processed {len(self.all_feelings_data)} feelings!")
         print(f"💾 Memory usage: ~{self.estimate_memory_usage()} MB")
     
     def estimate_memory_usage(self):
-        """Estimate memory usage of all combinations data"""
-        size = sys.getsizeof(self.all_combinations_data)
-        return round(size / (1024 * 1024), 2)
+        """Recursive size (MB) of the pre-processed state: base data of each feeling + payloads"""
+        size = deep_sizeof(self.base_feelings_data) + deep_sizeof(self.all_feelings_data)
+        return round(size / MB, 2)
+    
+    def memory_report(self, html_bytes=True):
+        """
+        Structured memory report:
+        - feelings: {feeling: {base_data_bytes, payload_bytes, html_bytes}} (recursive sizes, html_bytes = size of the
+          encoded JSON written in the page / shard, i.e. what the browser downloads and parses)
+        - frames: deep size of the loaded DataFrames
+        - phases: duration and tracemalloc peak of each pre-processing phase (peaks only with profile_memory=True)
+        - total: sums of the per-feeling columns
+        """
+        feelings = {}
+        for feeling in self.feelings:
+            if feeling not in self.base_feelings_data and feeling not in self.all_feelings_data:
+                continue
+            entry = {
+                # 0 after a parallel pre-processing: the base data stays in the worker processes
+                'base_data_bytes': deep_sizeof(self.base_feelings_data[feeling]) if feeling in self.base_feelings_data else 0,
+                'payload_bytes': deep_sizeof(self.all_feelings_data.get(feeling)),
+            }
+            if html_bytes:
+                payload = self.all_feelings_data.get(feeling)
+                entry['html_bytes'] = 0 if payload is None else len(json.dumps(self.encode_feeling_data(payload)).encode("utf-8"))
+            feelings[feeling] = entry
+        
+        frames = {name: deep_sizeof(getattr(self, name)) for name in ['df', 'et', 'et_p2d', 'hex', 'survey']}
+        total = {key: sum(entry[key] for entry in feelings.values()) for key in next(iter(feelings.values()), {})}
+        total['frames_bytes'] = sum(frames.values())
+        
+        return {
+            'feelings': feelings,
+            'frames': frames,
+            'phases': dict(self.memory_phases),
+            'total': total,
+        }
+    
+    def encode_feeling_data(self, payload):
+        """Typed-array encoding of the numeric columns of a payload (see payload_encoding.py)"""
+        if not self.typed_arrays:
+            return payload
+        return encode_payload(payload, self.plot_precision)
     
-    def generate_html(self):
-        """Generate the complete interactive HTML with all pre-processed combinations"""
-        available_feelings = list(self.base_feelings_data.keys())
+    def template_values(self, shard_files=None):
+        """
+        Values of the slots of templates/bubbles_diagram.html.
+        The inlined data is a generator: the page writer serializes and writes one feeling at a time.
+        With shard_files ({feeling: relative URL}), the data is not inlined and each feeling is fetched on demand.
+        """
+        # Only the feelings that have a payload (a feeling whose processing failed has neither data nor shard)
+        available_feelings = [feeling for feeling in self.feelings if feeling in self.all_feelings_data]
+        
+        if shard_files is None:
+            feelings_data = itertools.chain(["decodeTypedPayload("],
+                                            json_object_chunks(self.all_feelings_data.items(), self.encode_feeling_data),
+                                            [")"])
+        else:
+            feelings_data = "{}"
         
         # Create dropdown options
         feeling_options = ""
@@ -237,519 +378,115 @@ class PreprocessedFlexibleFeelingsAnalyzer:
         default_x = "Respondent count (fixation dwells)"
         default_y = "Dwell time (fixation, ms)"
         
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Eye Tracking Data Visualition</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        body {{ 
-            font-family: Arial, sans-serif; 
-            margin: 20px; 
-            background-color: #ffffff; 
-        }}
-        
-        .controls-section {{
-            display: flex;
-            justify-content: center;
-            margin-bottom: 20px;
-            gap: 20px;
-            flex-wrap: wrap;
-            align-items: flex-end;
-            padding: 20px;
-            background-color: #f8f9fa;
-            border-radius: 12px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-        
-        .dropdown-container {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            gap: 8px;
-        }}
-        
-        .dropdown-label {{
-            font-weight: bold;
-            color: #2649B2;
-            font-size: 14px;
-            text-align: center;
-        }}
-        
-        .dropdown-select {{
-            padding: 10px 14px;
-            border: 2px solid #2649B2;
-            border-radius: 8px;
-            background-color: white;
-            color: #2649B2;
-            font-size: 14px;
-            cursor: pointer;
-            outline: none;
-            min-width: 220px;
-            height: 44px;
-            transition: all 0.3s ease;
-        }}
-        
-        .dropdown-select:hover {{
-            background-color: #f0f4ff;
-            border-color: #1a3a8a;
-        }}
-        
-        .update-btn {{
-            background: linear-gradient(135deg, #2649B2, #1a3a8a);
-            color: white;
-            border: none;
-            padding: 0 28px;
-            height: 44px;
-            border-radius: 8px;
-            cursor: pointer;
-            font-size: 16px;
-            font-weight: bold;
-            transition: all 0.3s ease;
-            box-shadow: 0 4px 12px rgba(38, 73, 178, 0.3);
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            margin-top: 22px;
-        }}
-        
-        .update-btn:hover {{
-            background: linear-gradient(135deg, #1a3a8a, #0f2557);
-            transform: translateY(-2px);
-            box-shadow: 0 6px 16px rgba(38, 73, 178, 0.4);
-        }}
-        
-        //.info-bar {{
-        //    background: linear-gradient(135deg, #e8f4fd, #d4edda);
-        //    padding: 10px 20px;
-        //    border-radius: 8px;
-        //    margin-bottom: 20px;
-        //    text-align: center;
-        //    color: #155724;
-        //    border: 1px solid #c3e6cb;
-        //}}
-        
-        .main-container {{
-            display: flex;
-            gap: 20px;
-            align-items: flex-start;
-        }}
-        
-        .plot-section {{
-            flex: 1;
-        }}
-        
-        .sidebar {{
-            width: 200px;
-            display: flex;
-            flex-direction: column;
-            gap: 15px;
-        }}
-        
-        #back-btn {{ 
-            display: none; 
-            background: #2649B2; 
-            color: white; 
-            border: none; 
-            padding: 12px 24px; 
-            border-radius: 25px; 
-            cursor: pointer; 
-            font-size: 16px;
-            box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-            transition: all 0.3s ease;
-            width: 100%;
-        }}
-        
-        #back-btn:hover {{ 
-            background: #1a3a8a; 
-            transform: translateY(-2px);
-        }}
-        
-        .legend-container {{
-            display: none;
-            background: #f8f9fa;
-            border-radius: 10px;
-            padding: 15px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        
-        .legend-title {{
-            font-weight: bold;
-            color: #2649B2;
-            margin-bottom: 10px;
-            font-size: 14px;
-        }}
-        
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            margin-bottom: 8px;
-            font-size: 12px;
-            color: #333;
-        }}
-        
-        .legend-circle {{
-            width: 20px;
-            height: 20px;
-            border-radius: 50%;
-            background-color: #999999;
-            border: 1px solid #666666;
-            margin-right: 8px;
-            flex-shrink: 0;
-        }}
-        
-        .plot-container {{ 
-            background: #f8f9fa; 
-            border-radius: 10px; 
-            padding: 20px; 
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        
-        h1 {{ 
-            color: #2649B2; 
-            text-align: center; 
-            margin-bottom: 20px;
-        }}
-        
-        #main-plot {{
-            width: 100%;
-            height: 600px;
-        }}
-        
-        .loading {{
-            text-align: center;
-            color: #2649B2;
-            font-style: italic;
-            margin: 20px 0;
-            font-size: 16px;
-        }}
-    </style>
-</head>
-<body>
-    <h1>👁️‍🗨️ Eye Tracking Data Visualisation</h1>
+        return {
+            'combinations': f"{len(available_feelings) * len(self.available_metrics) * len(self.available_metrics):,}",
+            'feeling_options': feeling_options,
+            'x_metric_options': metric_options.replace(f'<option value="{default_x}">', f'<option value="{default_x}" selected>'),
+            'y_metric_options': metric_options.replace(f'<option value="{default_y}">', f'<option value="{default_y}" selected>'),
+            'js_decoder': JS_DECODER,
+            'feelings_data': feelings_data,
+            'shard_files': json.dumps(shard_files),
+            'shade_table': json.dumps({'names': self.shade_names.tolist(), 'colors': self.shade_colors,
+                                       'missing_color': MISSING_SHADE_COLOR}),
+            'available_feelings': json.dumps(available_feelings),
+            'available_metrics': json.dumps(self.available_metrics),
+            'webgl_threshold': json.dumps(self.webgl_threshold),
+            'default_x': json.dumps(default_x),
+            'default_y': json.dumps(default_y),
+        }
     
-    <!-- <div class="info-bar">
-        ✅ <strong>{len(available_feelings) * len(self.available_metrics) * len(self.available_metrics):,} combinations pre-processed</strong> - All metric changes use real data!
-    </div> -->
+    def write_html(self, output_path, shard_files=None):
+        """Stream the interactive page to disk: header, then the data feeling by feeling, then the script"""
+        PAGE_TEMPLATE.write(output_path, **self.template_values(shard_files))
     
-    <div class="controls-section">
-        <div class="dropdown-container">
-            <label class="dropdown-label" for="feeling-select">📊 Feeling Or Functional Benefit</label>
-            <select id="feeling-select" class="dropdown-select">
-                {feeling_options}
-            </select>
-        </div>
-        
-        <div class="dropdown-container">
-            <label class="dropdown-label" for="x-metric-select">↔️ X-Axis Metric</label>
-            <select id="x-metric-select" class="dropdown-select">
-                {metric_options.replace(f'<option value="{default_x}">', f'<option value="{default_x}" selected>')}
-            </select>
-        </div>
-        
-        <div class="dropdown-container">
-            <label class="dropdown-label" for="y-metric-select">↕️ Y-Axis Metric</label>
-            <select id="y-metric-select" class="dropdown-select">
-                {metric_options.replace(f'<option value="{default_y}">', f'<option value="{default_y}" selected>')}
-            </select>
-        </div>
-        
-        <button class="update-btn" onclick="updateVisualization()">🚀 Update Plot</button>
-    </div>
+    def generate_html(self, shard_files=None):
+        """Complete interactive HTML as a string (prefer write_html for the full dataset)"""
+        return PAGE_TEMPLATE.render(**self.template_values(shard_files))
     
-    <div id="loading-message" class="loading" style="display: none;">
-        🔄 Switching to new metric combination...
-    </div>
-    
-    <div class="main-container">
-        <div class="plot-section">
-            <div class="plot-container">
-                <div id="main-plot"></div>
-            </div>
-        </div>
-        
-        <div class="sidebar">
-            <button id="back-btn" onclick="showOverview()">⬅️ Back to Overview</button>
-            
-            <div id="legend-container" class="legend-container">
-                <div class="legend-title">Circle Size = Clicks</div>
-                <div class="legend-item">
-                    <div class="legend-circle" style="width: 10px; height: 10px;"></div>
-                    <span>0 clicks</span>
-                </div>
-                <div class="legend-item">
-                    <div class="legend-circle" style="width: 20px; height: 20px;"></div>
-                    <span>1 click</span>
-                </div>
-                <div class="legend-item">
-                    <div class="legend-circle" style="width: 30px; height: 30px;"></div>
-                    <span>2 clicks</span>
-                </div>
-                <div class="legend-item">
-                    <div class="legend-circle" style="width: 40px; height: 40px;"></div>
-                    <span>3 clicks</span>
-                </div>
-                <div class="legend-item">
-                    <div class="legend-circle" style="width: 60px; height: 60px;"></div>
-                    <span>5+ clicks</span> <!-- A CHANGER POUR METTRE TOUTES LES TAILLES DE RONDS -->
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        // ✅ ALL PRE-PROCESSED COMBINATIONS DATA
-        const allCombinationsData = {json.dumps(self.all_combinations_data)};
-        const availableFeelings = {json.dumps(available_feelings)};
-        const availableMetrics = {json.dumps(self.available_metrics)};
-        
-        // Current state
-        let currentView = 'overview';
-        let currentFeeling = availableFeelings[0];
-        let currentXMetric = "{default_x}";
-        let currentYMetric = "{default_y}";
-        
-        console.log('📊 Loaded data for', Object.keys(allCombinationsData).length, 'feelings');
-        console.log('🔍 First feeling has', Object.keys(allCombinationsData[currentFeeling] || {{}}).length, 'X-axis metrics');
-        
-        function updateVisualization() {{
-            const selectedFeeling = document.getElementById('feeling-select').value;
-            const selectedXMetric = document.getElementById('x-metric-select').value;
-            const selectedYMetric = document.getElementById('y-metric-select').value;
-            
-            console.log('🔄 Updating to:', selectedFeeling, selectedXMetric, 'vs', selectedYMetric);
-            
-            // Show loading message
-            document.getElementById('loading-message').style.display = 'block';
-            
-            // Update current state
-            currentFeeling = selectedFeeling;
-            currentXMetric = selectedXMetric;
-            currentYMetric = selectedYMetric;
-            
-            // Simulate brief loading for UX
-            setTimeout(() => {{
-                document.getElementById('loading-message').style.display = 'none';
-                showOverview();
-            }}, 200);
-        }}
-        
-        function getCurrentData() {{
-            // ✅ Get the ACTUAL pre-processed data for current combination
-            try {{
-                const data = allCombinationsData[currentFeeling][currentXMetric][currentYMetric];
-                console.log('📊 Retrieved data for', currentFeeling, currentXMetric, currentYMetric, ':', Object.keys(data.data).length, 'groups');
-                return data;
-            }} catch (error) {{
-                console.error('❌ Error getting data for combination:', currentFeeling, currentXMetric, currentYMetric, error);
-                return {{ data: {{}}, max_clicks: 0 }};
-            }}
-        }}
-        
-        function showOverview() {{
-            console.log('📈 Showing overview for:', currentFeeling, 'X:', currentXMetric, 'Y:', currentYMetric);
-            currentView = 'overview';
-            document.getElementById('back-btn').style.display = 'none';
-            document.getElementById('legend-container').style.display = 'none';
-            
-            // ✅ Get REAL data for current metric combination
-            const currentData = getCurrentData();
-            const groupData = currentData.data || {{}};
-            
-            // Create overview traces with REAL data
-            const traces = [];
-            const groups = Object.keys(groupData);
-            
-            if (groups.length === 0) {{
-                // Show message if no data available
-                const layout = {{
-                    title: currentYMetric + ' vs ' + currentXMetric + ' for ' + currentFeeling,
-                    xaxis: {{ title: currentXMetric }},
-                    yaxis: {{ title: currentYMetric }},
-                    height: 600,
-                    showlegend: false,
-                    plot_bgcolor: '#DBDBDB',
-                    paper_bgcolor: '#ffffff',
-                    annotations: [{{
-                        text: 'No data available for this metric combination',
-                        x: 0.5, y: 0.5, xref: 'paper', yref: 'paper',
-                        showarrow: false, font: {{ size: 16, color: '#666' }}
-                    }}]
-                }};
-                Plotly.newPlot('main-plot', [], layout);
-                return;
-            }}
-            
-            groups.forEach(group => {{
-                const data = groupData[group];
-                traces.push({{
-                    x: [data.center_x],
-                    y: [data.center_y],
-                    mode: 'markers+text',
-                    marker: {{
-                        size: data.marker_size,
-                        color: data.color,
-                        opacity: 1,
-                        line: {{ width: 4, color: '#DBDBDB' }}
-                    }},
-                    text: data.choice,
-                    textposition: 'middle center',
-                    textfont: {{ color: '#808080', size: 16, family: 'Arial Black' }},
-                    name: group,
-                    type: 'scatter',
-                    hovertemplate: '<b>' + group + '</b><br>Choice: ' + data.choice + '<br><i>Click to explore!</i><extra></extra>'
-                }});
-            }});
-            
-            const layout = {{
-                title: currentYMetric + ' vs ' + currentXMetric + ' for ' + currentFeeling,
-                xaxis: {{ 
-                    title: currentXMetric,
-                    showgrid: true,
-                    gridwidth: 2,
-                    gridcolor: '#e0e0e0',
-                    zeroline: true,
-                    zerolinecolor: '#d0d0d0',
-                    zerolinewidth: 2
-                }},
-                yaxis: {{ 
-                    title: currentYMetric,
-                    showgrid: true,
-                    gridwidth: 2,
-                    gridcolor: '#e0e0e0',
-                    zeroline: true,
-                    zerolinecolor: '#d0d0d0',
-                    zerolinewidth: 2
-                }},
-                height: 600,
-                showlegend: false,
-                plot_bgcolor: '#DBDBDB',
-                paper_bgcolor: '#ffffff'
-            }};
-            
-            Plotly.newPlot('main-plot', traces, layout);
-            
-            // Add click event listener
-            document.getElementById('main-plot').on('plotly_click', function(data) {{
-                if (currentView === 'overview' && data.points && data.points.length > 0) {{
-                    const groupName = data.points[0].data.name;
-                    console.log('👆 Clicked on group:', groupName);
-                    showDetail(groupName);
-                }}
-            }});
-        }}
-        
-        function showDetail(groupName) {{
-            console.log('🔍 Showing detail for:', groupName, 'in feeling:', currentFeeling);
-            currentView = 'detail_' + groupName;
-            document.getElementById('back-btn').style.display = 'block';
-            document.getElementById('legend-container').style.display = 'block';
-            
-            // ✅ Get REAL data for current metric combination
-            const currentData = getCurrentData();
-            const groupData = currentData.data || {{}};
-            const data = groupData[groupName];
-            
-            if (!data) {{
-                console.error('❌ No data found for group:', groupName);
-                return;
-            }}
-            
-            // Create rich customdata with multiple values
-            const customDataArray = data.detail_x.map((x, i) => [
-                data.detail_choice[i] || 0,           // Index 0: Clicks
-                data.detail_names ? data.detail_names[i] : `Point ${{i+1}}`,  // Index 1: Color name
-                data.detail_x[i],                     // Index 2: X value
-                data.detail_y[i]                     // Index 3: Y value
-            ]);
-            
-            // Create detail traces with REAL data
-            const traces = [
-                {{
-                    x: data.detail_x,
-                    y: data.detail_y,
-                    customdata: customDataArray,
-                    mode: 'markers+text',
-                    // mode: 'markers',
-                    // text: customdata[1],
-                    texttemplate: '%{{customdata[1]}}',
-                    textposition: 'bottom center',
-                    textfont: {{ color: '#808080', size: 10, family: 'Arial Black' }},
-                    marker: {{
-                        size: data.detail_size,
-                        color: data.detail_color,
-                        opacity: 1,
-                        line: {{ width: 1, color: '#DBDBDB' }}
-                    }},
-                    name: groupName + ' Details',
-                    type: 'scatter',
-                    hovertemplate: '<b>🎨 %{{customdata[1]}}</b><br>' +
-                                  '<b>📊 ' + groupName + '</b><br>' +
-                                  '▪️ ' + currentXMetric + ': %{{x:.2f}}<br>' +
-                                  '▪️ ' + currentYMetric + ': %{{y:.2f}}<br>' +
-                                  '🖱️ Clicks: %{{customdata[0]}}<br>' 
-                }}
-            ];
-            
-            const layout = {{
-                title: groupName + ' Details (' + data.detail_x.length + ' points) - ' + currentFeeling,
-                xaxis: {{ 
-                    title: currentXMetric,
-                    showgrid: true,
-                    gridwidth: 2,
-                    gridcolor: '#e0e0e0',
-                    zeroline: true,
-                    zerolinecolor: '#d0d0d0',
-                    zerolinewidth: 2
-                }},
-                yaxis: {{ 
-                    title: currentYMetric,
-                    showgrid: true,
-                    gridwidth: 2,
-                    gridcolor: '#e0e0e0',
-                    zeroline: true,
-                    zerolinecolor: '#d0d0d0',
-                    zerolinewidth: 2
-                }},
-                height: 600,
-                showlegend: false,
-                plot_bgcolor: '#DBDBDB',
-                paper_bgcolor: '#ffffff'
-            }};
-            
-            Plotly.newPlot('main-plot', traces, layout);
-        }}
-        
-        // Initialize when page loads
-        document.addEventListener('DOMContentLoaded', function() {{
-            console.log('🚀 DOM loaded, initializing with real pre-processed data');
-            showOverview();
-        }});
-    </script>
-</body>
-</html>
+    def write_sharded_html(self, output_path, shard_dir_name="shards"):
         """
-        
-        return html_content
+        Write a small index page plus one gzipped JSON shard per feeling next to it.
+        The page has to be served over HTTP (e.g. python -m http.server) for the shards to be fetched.
+        Shard names carry a hash of their content: a rebuild gives new URLs, so the shards can be cached for good
+        without a browser ever decoding an old shard with the shade table / metrics of a newer page.
+        Shards of previous builds left in shard_dir are removed.
+        """
+        output_path = pathlib.Path(output_path)
+        shard_dir = output_path.parent / shard_dir_name
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        
+        shard_files = {}
+        for i, (feeling, payload) in enumerate(self.all_feelings_data.items()):
+            data = json.dumps(self.encode_feeling_data(payload)).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            file_name = f"{i:02d}_{re.sub(r'[^A-Za-z0-9-]+', '_', feeling)}.{digest}.json.gz"
+            with open(shard_dir / file_name, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as f:
+                f.write(data)
+            shard_files[feeling] = f"{shard_dir_name}/{file_name}"
+        
+        written = {pathlib.PurePosixPath(shard_file).name for shard_file in shard_files.values()}
+        for stale in shard_dir.glob("*.json.gz"):
+            if stale.name not in written:
+                stale.unlink()
+        
+        self.write_html(output_path, shard_files=shard_files)
+        
+        return shard_files
+
+# True: index page + one shard per feeling loaded on demand (needs an HTTP server), False: single self-contained page
+SHARDED_OUTPUT = False
 
-# Create analyzer instance and generate HTML
-print("🚀 Initializing Fully Pre-processed Feelings Analyzer...")
-analyzer = PreprocessedFlexibleFeelingsAnalyzer()
+# Number of worker processes for the pre-processing (None = sequential, e.g. os.cpu_count() on the analysis box)
+N_WORKERS = None
 
-# Generate and save HTML
-html_content = analyzer.generate_html()
+# True: tracemalloc peak of each pre-processing phase in the memory report (slows the pre-processing down)
+PROFILE_MEMORY = False
 
-with open("eye_tracking_data_viz.html", "w", encoding="utf-8") as f:
-    f.write(html_content)
+# True: .gz (and .br with the brotli package) siblings of the page and shards, plus static_manifest.json for a static server
+PRECOMPRESS_OUTPUT = False
 
-total_combinations = len(analyzer.all_combinations_data) * len(analyzer.available_metrics) * len(analyzer.available_metrics)
+def main(output_name="eye_tracking_data_viz.html", sort_by_size=False):
+    # Create analyzer instance and generate HTML
+    print("🚀 Initializing Fully Pre-processed Feelings Analyzer...")
+    analyzer = PreprocessedFlexibleFeelingsAnalyzer(n_workers=N_WORKERS, profile_memory=PROFILE_MEMORY,
+                                                   sort_by_size=sort_by_size)
+    
+    # Generate and save HTML
+    output_path = pathlib.Path(output_name)
+    published = [output_path]
+    if SHARDED_OUTPUT:
+        shard_files = analyzer.write_sharded_html(output_path)
+        published += [output_path.parent / shard_file for shard_file in shard_files.values()]
+        print("📂 Shards written to ./shards - serve this folder with: python -m http.server")
+    else:
+        analyzer.write_html(output_path)
+    
+    if PRECOMPRESS_OUTPUT:
+        # The page keeps its name from one run to the next: revalidated; the shards have content-hashed names and are cached
+        manifest_path = build_static_manifest(output_path.parent, published, revalidate=[output_path])
+        sizes = compression_summary(manifest_path)
+        print("🗜️ Precompressed: " + ", ".join(f"{size / MB:.2f} MB {encoding}" for encoding, size in sizes.items()))
+    
+    total_combinations = len(analyzer.all_feelings_data) * len(analyzer.available_metrics) * len(analyzer.available_metrics)
+    
+    print(f"\n🎉 SUCCESS! Created: {output_name}")
+    print(f"✅ Features:")
+    print(f"   📊 ALL {len(analyzer.all_feelings_data)} feelings available")
+    print(f"   ↔️ {len(analyzer.available_metrics)} X-axis metrics")
+    print(f"   ↕️ {len(analyzer.available_metrics)} Y-axis metrics") 
+    print(f"   🚀 {total_combinations:,} combinations available (paired in the browser)")
+    print(f"   ⚡ INSTANT metric switching with REAL data!")
+    print(f"   💾 Estimated memory usage: ~{analyzer.estimate_memory_usage()} MB")
+    
+    # Detailed memory report (MB per feeling, DataFrames and phases)
+    report = analyzer.memory_report()
+    print(f"\n💾 Memory report (MB):\n{report_frame(report).to_string()}")
+    print(f"   DataFrames: {report['total']['frames_bytes'] / MB:.2f} MB")
+    for phase, stats in report['phases'].items():
+        peak = f", peak {stats['peak_bytes'] / MB:.2f} MB" if 'peak_bytes' in stats else ""
+        print(f"   ⏱️ {phase}: {stats['seconds']} s{peak}")
+    
+    return analyzer
 
-print(f"\n🎉 SUCCESS! Created: eye_tracking_data_viz.html")
-print(f"✅ Features:")
-print(f"   📊 ALL {len(analyzer.base_feelings_data)} feelings available")
-print(f"   ↔️ {len(analyzer.available_metrics)} X-axis metrics")
-print(f"   ↕️ {len(analyzer.available_metrics)} Y-axis metrics") 
-print(f"   🚀 {total_combinations:,} combinations pre-processed")
-print(f"   ⚡ INSTANT metric switching with REAL data!")
-print(f"   💾 Estimated memory usage: ~{analyzer.estimate_memory_usage()} MB")
-print(f"\n💡 Now when you change metrics, you'll see ACTUAL data changes!")
\ No newline at end of file
+if __name__ == "__main__":
+    analyzer = main()
@@ -0,0 +1,75 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import hashlib
+import json
+import pathlib
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def content_hash(*parts):
+    """
+        SHA-256 of the data slice and parameters an output is built from. DataFrames / Series are hashed by content
+        (pd.util.hash_pandas_object, index included, plus column names and dtypes), anything else through its JSON form.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            header = list(part.columns) if isinstance(part, pd.DataFrame) else [part.name]
+            dtypes = part.dtypes.astype(str).tolist() if isinstance(part, pd.DataFrame) else [str(part.dtype)]
+            digest.update(json.dumps([header, dtypes], default=str).encode())
+            digest.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+        JSON record of generated outputs: key -> {"hash": inputs hash, "files": [paths relative to the manifest], ...}.
+        An output is fresh when its inputs hash is unchanged and all of its files still exist; only stale outputs need
+        to be regenerated. force=True treats everything as stale (full rebuild) while still recording the new hashes.
+    """
+
+    def __init__(self, path, force=False):
+        self.path = pathlib.Path(path)
+        self.force = force
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def _relative(self, file):
+        file = pathlib.Path(file)
+        try:
+            return file.resolve().relative_to(self.path.parent.resolve()).as_posix()
+        except ValueError:
+            return str(file)
+
+    def files(self, key):
+        """Absolute paths of the files recorded for key"""
+        entry = self.entries.get(key, {})
+        return [self.path.parent / file for file in entry.get("files", [])]
+
+    def is_fresh(self, key, digest):
+        entry = self.entries.get(key)
+        if self.force or entry is None or entry["hash"] != digest:
+            return False
+        return all(file.exists() for file in self.files(key))
+
+    def record(self, key, digest, files, **extra):
+        self.entries[key] = {"hash": digest, "files": [self._relative(file) for file in files], **extra}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        tmp.replace(self.path)
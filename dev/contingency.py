@@ -0,0 +1,156 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import numpy as np
+import pathlib
+from scipy import sparse
+from scipy import stats
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def sparse_counts(df, row_col, col_col, weight=None):
+    """
+        Build a sparse row_col x col_col count matrix from a long survey table (one line per answer).
+        Returns the CSR matrix with the sorted row and column labels.
+    """
+    data = df[[row_col, col_col] + ([weight] if weight else [])].dropna(subset=[row_col, col_col])
+    row_codes, row_labels = pd.factorize(data[row_col], sort=True)
+    col_codes, col_labels = pd.factorize(data[col_col], sort=True)
+    values = np.ones(len(data)) if weight is None else data[weight].fillna(0).to_numpy(dtype=float)
+
+    # Duplicate (row, col) pairs are summed when converting to CSR
+    counts = sparse.coo_matrix((values, (row_codes, col_codes)), shape=(len(row_labels), len(col_labels))).tocsr()
+
+    return counts, pd.Index(row_labels, name=row_col), pd.Index(col_labels, name=col_col)
+
+
+def contingency_analysis(counts, row_labels, col_labels, row_name="Feeling", col_name="Colour", include_zeros=False):
+    """
+        Chi-square test of independence computed directly on the sparse matrix.
+        Expected counts, Pearson residuals, adjusted standardized residuals and lift are computed for every cell in
+        a single vectorized pass (only the non-zero cells unless include_zeros=True).
+        Returns (cells, summary).
+    """
+    counts = sparse.csr_matrix(counts, dtype=float)
+    n = counts.sum()
+    row_tot = np.asarray(counts.sum(axis=1)).ravel()
+    col_tot = np.asarray(counts.sum(axis=0)).ravel()
+
+    if include_zeros:
+        rows, cols = np.indices(counts.shape).reshape(2, -1)
+        observed = counts.toarray().ravel()
+    else:
+        coo = counts.tocoo()
+        rows, cols, observed = coo.row, coo.col, coo.data
+
+    expected = row_tot[rows] * col_tot[cols] / n
+
+    # Σ (O - E)² / E = Σ O² / E - n, so only the non-zero cells are needed
+    nz = counts.tocoo()
+    chi2 = float((nz.data ** 2 / (row_tot[nz.row] * col_tot[nz.col] / n)).sum() - n)
+    n_rows, n_cols = (row_tot > 0).sum(), (col_tot > 0).sum()
+    dof = int((n_rows - 1) * (n_cols - 1))
+    p_value = float(stats.chi2.sf(chi2, dof)) if dof > 0 else np.nan
+    k = min(n_rows, n_cols) - 1
+    cramers_v = float(np.sqrt(chi2 / (n * k))) if k > 0 else np.nan
+
+    residual = (observed - expected) / np.sqrt(expected)
+    adjusted = (observed - expected) / np.sqrt(expected * (1 - row_tot[rows] / n) * (1 - col_tot[cols] / n))
+
+    cells = pd.DataFrame({
+        row_name: row_labels[rows],
+        col_name: col_labels[cols],
+        "Count": observed,
+        "Expected": expected,
+        "Residual": residual,
+        "Adjusted residual": adjusted,
+        "Lift": observed / expected,
+    })
+    cells = cells.sort_values([row_name, col_name], ignore_index=True)
+
+    summary = pd.Series({
+        "Total": n,
+        "Rows": int(n_rows),
+        "Columns": int(n_cols),
+        "Chi2": chi2,
+        "Degrees of freedom": dof,
+        "p-value": p_value,
+        "Cramer's V": cramers_v,
+    }, name="Value")
+
+    return cells, summary
+
+
+def save_contingency(cells, summary, path):
+    """Write the cell table and the test summary in the same workbook"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with pd.ExcelWriter(path) as writer:
+        cells.to_excel(writer, sheet_name="Cells", index=False)
+        summary.to_excel(writer, sheet_name="Summary")
+
+
+def load_contingency(path):
+    """Read back a table written by save_contingency"""
+    cells = pd.read_excel(path, sheet_name="Cells")
+    summary = pd.read_excel(path, sheet_name="Summary", index_col=0).iloc[:, 0]
+    return cells, summary
+
+
+def cached_contingency(path, sources, df_loader, row_col, col_col, row_name="Feeling", col_name="Colour", weight=None):
+    """
+        Return the contingency tables stored in path, rebuilding them only when one of the source workbooks is newer
+        than the cache (or when the cached cells do not have the row_name / col_name columns). df_loader is only called
+        on a rebuild.
+    """
+    if path.exists() and all(path.stat().st_mtime >= pathlib.Path(source).stat().st_mtime for source in sources):
+        cells, summary = load_contingency(path)
+        if {row_name, col_name}.issubset(cells.columns):
+            return cells, summary
+
+    counts, row_labels, col_labels = sparse_counts(df_loader(), row_col, col_col, weight)
+    cells, summary = contingency_analysis(counts, row_labels, col_labels, row_name, col_name)
+    save_contingency(cells, summary, path)
+
+    return cells, summary
+
+
+#%%
+####################################################################################################################################
+# MAIN
+####################################################################################################################################
+
+def main():
+    parent_path = pathlib.Path(__file__).parent.parent # Chemin parent du dossier (Emoskin)
+    files_path = parent_path / "Files"
+    res_path = parent_path / "Results" / "Tableaux" / "Contingency"
+
+    survey_file = files_path / "survey.xlsx"
+    emotion_file = files_path / "emotion_survey.xlsx"
+    benefits_file = files_path / "functional_benefits.xlsx"
+
+    # Chaque fichier produit a des colonnes "Feeling" / "Colour" et peut donc être passé tel quel à
+    # ColorEmotionVisualizer (feeling_viz.py) pour les Sankey / icicle. Pour Full_Shades, la colonne "Colour"
+    # contient les noms de shades (les noeuds du Sankey sont alors les shades)
+    tables = {
+        "Full_Colours": (survey_file, "Full Survey Response", "Word_EmotionOrBenefit", "Choice"),
+        "Full_Shades": (survey_file, "Full Survey Response", "Word_EmotionOrBenefit", "OA Name"),
+        "Emotions_Colours": (emotion_file, "Emotion Survey Response", "Emotion", "Choice"),
+        "Benefits_Colours": (benefits_file, "Benefits survey", "Benefit", "Choice"),
+    }
+
+    for name, (source, sheet, row_col, col_col) in tables.items():
+        cells, summary = cached_contingency(res_path / f"{name}.xlsx", [source],
+                                            lambda source=source, sheet=sheet: pd.read_excel(source, sheet_name=sheet),
+                                            row_col, col_col)
+        cramers_v = summary["Cramer's V"]
+        print(f"{name}: chi2 = {summary['Chi2']:.2f}, p = {summary['p-value']:.3g}, Cramér's V = {cramers_v:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import numpy as np
+import re
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+FEELINGS = ["Happy", "Relaxed", "Energized", "Surprised", "Self-Confident", "Sensual", "Reassured", "Calm", "Secured", "Intrigued",
+    "Hydrating", "Anti-Ageing", "Purifying", "Nourishing", "Soothing", "Refreshing", "Repairing", "Protecting", "Softening", "Glowing"]
+
+COLORS = ["Whites", "Yellows", "Blues", "Greens", "Lavenders", "Oranges", "Reds"]
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def load_et(parent_path):
+    """Read the ET export the same way as the tri_* scripts"""
+    return pd.read_excel(parent_path / "Files" / "ET_modified.xlsx", usecols="B:C, F:L, P:AO, AQ:AW, BC: BE", skiprows=6)
+
+
+def _alternation(words):
+    # Les mots les plus longs d'abord pour que la regex ne s'arrête pas sur un préfixe
+    return "(" + "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)) + ")"
+
+
+def annotate_labels(et, feelings=FEELINGS, colors=COLORS):
+    """
+        Add the Phase, Feeling, Colour and Shade columns parsed from the AOI labels, in one vectorized pass per column.
+        P2d rows carry the colour family in "Parent Label" (P2d_<Feeling>_<Colour>), P2b rows in "Label".
+    """
+    et = et.copy()
+    parent = et["Parent Label"].astype("string")
+    et["Phase"] = parent.str.split("_").str[0]
+    et["Feeling"] = parent.str.extract(_alternation(feelings), expand=False)
+    colour = parent.str.extract(_alternation(colors), expand=False)
+    if "Label" in et.columns:
+        colour = colour.fillna(et["Label"].astype("string").str.extract(_alternation(colors), expand=False))
+    et["Colour"] = colour
+    if "Label_modified" in et.columns:
+        et["Shade"] = et["Label_modified"].astype("string").str.split("_").str[-1]
+
+    return et
+
+
+def group_codes(labels, groups):
+    """Position in groups of the colour family found in each label (-1 when none), computed once per feeling"""
+    found = labels.astype("string").str.extract(_alternation(groups), expand=False)
+    return pd.Categorical(found, categories=list(groups)).codes.astype(np.int64)
+
+
+def group_details(shades, codes, groups, choice, hex=None, sort_by_size=False):
+    """
+        Detail arrays of all the colour-family groups of a feeling in one pass, instead of one str.contains / isin /
+        value_counts per group. shades is the index of the ET rows (shade names), codes their group_codes, choice the
+        survey answers indexed by shade (one line per click).
+        Returns the groups that have rows, the offsets of each group in the arrays, the positions of the rows (grouped,
+        original order kept inside a group), their shade names, clicks and, when the hex table is given, HEX colours.
+        With sort_by_size, the draw order is precomputed: groups by total clicks and shades by clicks, biggest first
+        (ties keep the original order), so the small bubbles are drawn on top.
+    """
+    codes = np.asarray(codes)
+    rows = np.flatnonzero(codes >= 0)
+    rows = rows[np.argsort(codes[rows], kind="stable")]
+    counts = np.bincount(codes[rows], minlength=len(groups))
+    clicks = choice.index.value_counts().reindex(shades[rows]).fillna(0).astype(int).to_numpy()
+
+    order = np.arange(len(groups))
+    if sort_by_size:
+        totals = np.bincount(codes[rows], weights=clicks, minlength=len(groups))
+        order = np.argsort(-totals, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(groups))
+        # np.lexsort est stable: dernière clé = clé principale
+        by_size = np.lexsort((-clicks, rank[codes[rows]]))
+        rows, clicks = rows[by_size], clicks[by_size]
+
+    present = order[counts[order] > 0]
+    names = shades[rows]
+    details = {
+        "groups": [groups[i] for i in present],
+        "offsets": np.concatenate([[0], np.cumsum(counts[present])]).tolist(),
+        "rows": rows,
+        "names": names,
+        "clicks": clicks,
+    }
+    if hex is not None:
+        details["colors"] = hex.loc[~hex.index.duplicated(), "HEX"].reindex(names).fillna("#CCCCCC").tolist()
+
+    return details
@@ -1,11 +1,46 @@
 import pandas as pd
+import numpy as np
+import plotly
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from plotly.offline import get_plotlyjs
 import os
+import shutil
+import filecmp
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import warnings
 warnings.filterwarnings('ignore')
 
+from payload_encoding import encode_payload, JS_DECODER
+from html_template import StreamingTemplate, json_object_chunks
+from build_manifest import BuildManifest, content_hash
+from static_assets import build_static_manifest, compression_summary, remove_outputs
+
+CHART_TYPES = ['sankey', 'icicle', 'combined']
+
+# True: .gz (and .br with the brotli package) siblings of the pages plus static_manifest.json for a static server
+PRECOMPRESS_OUTPUT = False
+
+# Visualizer read by the worker processes: inherited through fork (copy-on-write), never pickled
+_WORKER_VISUALIZER = None
+
+def _save_metric_charts(visualizer, job):
+    """(metric, manifest entries, error) of one metric"""
+    metric, timestamp = job
+    try:
+        return metric, visualizer.save_metric_charts(metric, timestamp), None
+    except Exception as e:
+        return metric, [], str(e)
+
+def _save_metric_charts_worker(job):
+    """Build and write the charts of one metric in a worker process"""
+    return _save_metric_charts(_WORKER_VISUALIZER, job)
+
+@lru_cache(maxsize=None)
 def hex_to_rgba(hex_color, alpha=0.6):
     """Convert hex color to rgba with transparency"""
     hex_color = hex_color.lstrip('#')
@@ -17,8 +52,14 @@ def hex_to_rgba(hex_color, alpha=0.6):
     return hex_color
 
 class ColorEmotionVisualizer:
-    def __init__(self, file_path):
-        """Initialize the visualizer with data from CSV or XLSX file"""
+    def __init__(self, file_path, include_plotlyjs='directory', plotlyjs_bundle=None):
+        """
+        Initialize the visualizer with data from CSV or XLSX file.
+        include_plotlyjs is passed to write_html: 'directory' writes plotly-<version>.min.js once in the output directory
+        and every page references it, True embeds the ~3.5 MB bundle in each page (self-contained files), 'cdn' loads it
+        from the plotly CDN. plotlyjs_bundle is the path of a custom (e.g. partial) plotly.js build, copied once in the
+        output directory and referenced by every page instead of the full bundle.
+        """
         
         # Determine file type and load accordingly
         if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
@@ -72,6 +113,10 @@ class ColorEmotionVisualizer:
         self.output_dir = "html_viz"
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # How the pages get plotly.js (shared file in output_dir by default)
+        self.include_plotlyjs = include_plotlyjs
+        self.plotlyjs_bundle = plotlyjs_bundle
+        
         print(f"✅ Data preprocessing complete!")
         print(f"📋 Total records: {len(self.df)}")
         print(f"🎭 Unique emotions: {list(self.df['Feeling'].unique())}")
@@ -84,56 +129,93 @@ class ColorEmotionVisualizer:
         for emotion, count in emotion_counts.items():
             print(f"   {emotion}: {count} colors")
         
-    def create_sankey_chart(self, size_metric):
-        """Create Sankey diagram"""
-        filtered_df = self.df.copy()
-        
-        # Prepare data for Sankey
-        feelings = sorted(filtered_df['Feeling'].unique())
-        colors = sorted(filtered_df['Colour'].unique())
-        
-        # Create node labels and colors
-        node_labels = list(feelings) + list(colors)
-        node_colors = [self.color_palette.get(label, '#cccccc') for label in node_labels]
-        
-        # Create links
-        source = []
-        target = []
-        values = []
-        link_colors = []
-        
-        feeling_to_idx = {feeling: i for i, feeling in enumerate(feelings)}
-        color_to_idx = {color: i + len(feelings) for i, color in enumerate(colors)}
-        
-        for _, row in filtered_df.iterrows():
-            feeling_idx = feeling_to_idx[row['Feeling']]
-            color_idx = color_to_idx[row['Colour']]
-            value = float(row[size_metric])  # type: ignore # Ensure it's a number
+        # Integer codes of the Feeling / Colour columns, rebuilt when their content (or the palette) changes
+        self._codes_key = None
+        self._codes = None
+    
+    def encoded(self):
+        """
+        Feeling / Colour columns of self.df as integer codes into their sorted unique values, shared by all charts.
+        Rows with a missing Feeling or Colour (code -1) are dropped, as a groupby on these columns would do: 'keep' is
+        the mask of the rows kept, in the order of self.df.
+        Also holds the node colours and the RGBA colour of the links of each feeling.
+        The cache is keyed on the content of the two columns and the palette, so in-place edits of self.df (or a new
+        frame) are picked up on the next call.
+        """
+        key = content_hash(self.df[['Feeling', 'Colour']], self.color_palette)
+        if key != self._codes_key:
+            feeling = pd.Categorical(self.df['Feeling'])
+            colour = pd.Categorical(self.df['Colour'])
+            feelings = list(feeling.categories)
+            colors = list(colour.categories)
+            keep = (feeling.codes >= 0) & (colour.codes >= 0)
             
-            source.append(feeling_idx)
-            target.append(color_idx)
-            values.append(value)
-            # Convert hex to rgba for transparency
-            base_color = self.color_palette.get(row['Feeling'], '#cccccc')
-            transparent_color = hex_to_rgba(base_color, 0.6)
-            link_colors.append(transparent_color)
-        
-        # Create Sankey diagram
-        fig = go.Figure(data=[go.Sankey(
+            self._codes = {
+                'feelings': feelings,
+                'colors': colors,
+                'keep': keep,
+                'feeling': feeling.codes[keep].astype(np.int64),
+                'colour': colour.codes[keep].astype(np.int64),
+                'node_colors': [self.color_palette.get(label, '#cccccc') for label in feelings + colors],
+                'link_colors': np.array([hex_to_rgba(self.color_palette.get(f, '#cccccc'), 0.6) for f in feelings], dtype=object),
+            }
+            self._codes_key = key
+        
+        return self._codes
+    
+    def metric_values(self, size_metric):
+        """Values of a metric as floats, aligned with the codes of encoded() (rows without Feeling / Colour dropped)"""
+        return self.df[size_metric].to_numpy(dtype=float)[self.encoded()['keep']]
+    
+    def sankey_trace(self, size_metric):
+        """
+        Sankey trace built from the integer codes (links in the row order of self.df).
+        Returned as a plain dict: plotly validates it once, when it is added to a figure.
+        """
+        codes = self.encoded()
+        
+        return dict(
+            type='sankey',
             node=dict(
                 pad=15,
                 thickness=20,
                 line=dict(color="black", width=0.5),
-                label=node_labels,
-                color=node_colors
+                label=codes['feelings'] + codes['colors'],
+                color=codes['node_colors']
             ),
             link=dict(
-                source=source,
-                target=target,
-                value=values,
-                color=link_colors
+                source=codes['feeling'],
+                target=codes['colour'] + len(codes['feelings']),
+                value=self.metric_values(size_metric),
+                color=codes['link_colors'][codes['feeling']]
             )
-        )])
+        )
+    
+    def icicle_trace(self, size_metric):
+        """Icicle trace (plain dict): one parent per feeling (total of its colours, single groupby) then one child per row"""
+        codes = self.encoded()
+        values = self.metric_values(size_metric)
+        feelings = np.array(codes['feelings'], dtype=object)
+        colors = np.array(codes['colors'], dtype=object)
+        
+        parent_totals = pd.Series(values).groupby(codes['feeling']).sum().reindex(range(len(feelings)), fill_value=0)
+        child_feelings = feelings[codes['feeling']]
+        child_colors = colors[codes['colour']]
+        
+        return dict(
+            type='icicle',
+            ids=np.concatenate([feelings, child_feelings + "_" + child_colors]),
+            labels=np.concatenate([feelings, child_colors]),
+            parents=np.concatenate([np.full(len(feelings), ''), child_feelings]),
+            values=np.concatenate([parent_totals.to_numpy(dtype=float), values]),
+            branchvalues="total",
+            maxdepth=2,
+            tiling=dict(orientation='v')
+        )
+    
+    def create_sankey_chart(self, size_metric, trace=None):
+        """Create Sankey diagram (trace: already built sankey_trace of the metric)"""
+        fig = go.Figure(data=[self.sankey_trace(size_metric) if trace is None else trace])
         
         fig.update_layout(
             title=f"Sankey Diagram: Emotion to Color Flow<br>Sized by {size_metric}",
@@ -144,42 +226,9 @@ class ColorEmotionVisualizer:
         
         return fig
     
-    def create_icicle_chart(self, size_metric):
-        """Create Icicle chart"""
-        filtered_df = self.df.copy()
-        
-        # Prepare data for Icicle
-        icicle_data = []
-        
-        # Add parent nodes (feelings)
-        for feeling in sorted(filtered_df['Feeling'].unique()):
-            icicle_data.append({
-                'ids': feeling,
-                'labels': feeling,
-                'parents': '',
-                'values': float(filtered_df[filtered_df['Feeling'] == feeling][size_metric].sum())
-            })
-        
-        # Add child nodes (colors)
-        for _, row in filtered_df.iterrows():
-            icicle_data.append({
-                'ids': f"{row['Feeling']}_{row['Colour']}",
-                'labels': row['Colour'],
-                'parents': row['Feeling'],
-                'values': float(row[size_metric]) # type: ignore
-            })
-        
-        icicle_df = pd.DataFrame(icicle_data)
-        
-        fig = go.Figure(go.Icicle(
-            ids=icicle_df['ids'],
-            labels=icicle_df['labels'],
-            parents=icicle_df['parents'],
-            values=icicle_df['values'],
-            branchvalues="total",
-            maxdepth=2,
-            tiling=dict(orientation='v')
-        ))
+    def create_icicle_chart(self, size_metric, trace=None):
+        """Create Icicle chart (trace: already built icicle_trace of the metric)"""
+        fig = go.Figure(self.icicle_trace(size_metric) if trace is None else trace)
         
         fig.update_layout(
             title=f"Icicle Chart: Hierarchical Color Preferences<br>Sized by {size_metric}",
@@ -190,8 +239,8 @@ class ColorEmotionVisualizer:
         
         return fig
     
-    def create_combined_chart(self, size_metric):
-        """Create both charts side by side"""
+    def create_combined_chart(self, size_metric, sankey=None, icicle=None):
+        """Create both charts side by side (sankey / icicle: already built traces of the metric)"""
         # Create subplots
         fig = make_subplots(
             rows=1, cols=2,
@@ -201,14 +250,10 @@ class ColorEmotionVisualizer:
         )
         
         # Add Sankey
-        sankey_fig = self.create_sankey_chart(size_metric)
-        sankey_trace = sankey_fig.data[0]
-        fig.add_trace(sankey_trace, row=1, col=1)
+        fig.add_trace(self.sankey_trace(size_metric) if sankey is None else sankey, row=1, col=1)
         
         # Add Icicle
-        icicle_fig = self.create_icicle_chart(size_metric)
-        icicle_trace = icicle_fig.data[0]
-        fig.add_trace(icicle_trace, row=1, col=2)
+        fig.add_trace(self.icicle_trace(size_metric) if icicle is None else icicle, row=1, col=2)
         
         fig.update_layout(
             title=f"Combined View: Sized by {size_metric}",
@@ -218,8 +263,82 @@ class ColorEmotionVisualizer:
         
         return fig
     
-    def save_all_charts_for_all_metrics(self):
-        """Save all chart types for all available metrics"""
+    def metric_charts(self, size_metric):
+        """The three figures of a metric, the Sankey and icicle traces being built only once"""
+        sankey = self.sankey_trace(size_metric)
+        icicle = self.icicle_trace(size_metric)
+        return {
+            'sankey': self.create_sankey_chart(size_metric, sankey),
+            'icicle': self.create_icicle_chart(size_metric, icicle),
+            'combined': self.create_combined_chart(size_metric, sankey, icicle)
+        }
+    
+    def plotlyjs_reference(self):
+        """
+        include_plotlyjs value for the pages of output_dir. The shared file (plotly-<version>.min.js or the custom bundle)
+        is written there before any page, so parallel writers never race on it. The plotly.js file is named after the
+        plotly version: after an upgrade the new pages get a new file instead of the old bundle with the new figure JSON.
+        The custom bundle is copied again whenever it differs from the copy in output_dir.
+        """
+        if self.plotlyjs_bundle is not None:
+            bundle_name = os.path.basename(self.plotlyjs_bundle)
+            bundle_path = os.path.join(self.output_dir, bundle_name)
+            if not os.path.exists(bundle_path) or not filecmp.cmp(self.plotlyjs_bundle, bundle_path, shallow=False):
+                shutil.copyfile(self.plotlyjs_bundle, bundle_path)
+            return bundle_name
+        
+        if self.include_plotlyjs == 'directory':
+            bundle_name = f'plotly-{plotly.__version__}.min.js'
+            bundle_path = os.path.join(self.output_dir, bundle_name)
+            if not os.path.exists(bundle_path):
+                with open(bundle_path, 'w', encoding='utf-8') as f:
+                    f.write(get_plotlyjs())
+            return bundle_name
+        return self.include_plotlyjs
+    
+    def write_figure(self, fig, filename):
+        """Write a figure in output_dir with the shared plotly.js mode, returns its path"""
+        filepath = os.path.join(self.output_dir, filename)
+        fig.write_html(filepath, include_plotlyjs=self.plotlyjs_reference())
+        return filepath
+    
+    def metric_hash(self, metric):
+        """
+        Hash of everything the pages of a metric depend on: its data slice, the colours, the plotly version (figure
+        JSON) and the plotly.js mode
+        """
+        return content_hash(self.df[['Feeling', 'Colour', metric]], self.color_palette, CHART_TYPES,
+                            plotly.__version__, str(self.plotlyjs_reference()))
+    
+    @staticmethod
+    def safe_name(metric):
+        """Metric name usable in a file name"""
+        return metric.replace(' ', '_').replace('(', '').replace(')', '').replace('%', 'pct').replace(',', '')
+    
+    def save_metric_charts(self, metric, timestamp):
+        """Build and write the Sankey, icicle and combined pages of one metric, returns their manifest entries"""
+        entries = []
+        for chart_type, fig in self.metric_charts(metric).items():
+            filename = f"{chart_type}_{self.safe_name(metric)}_{timestamp}.html"
+            filepath = self.write_figure(fig, filename)
+            entries.append({
+                'metric': metric,
+                'chart': chart_type,
+                'file': filename,
+                'bytes': os.path.getsize(filepath)
+            })
+        return entries
+    
+    def save_all_charts_for_all_metrics(self, n_workers=None, force=False):
+        """
+        Save all chart types for all available metrics.
+        With n_workers > 1, the metrics are built and written by a pool of worker processes (fork, the data is shared
+        copy-on-write). File names only depend on the chart type, the metric and the run timestamp, and a manifest
+        (charts_manifest_<timestamp>.json) lists the files in metric order.
+        Incremental: output_dir/build_manifest.json keeps the hash of each metric's inputs, and a metric whose hash did
+        not change keeps its pages from the previous run (force=True rebuilds everything). The pages a rebuilt metric
+        replaces, those of metrics no longer in the data and the previous charts manifests are deleted.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         saved_files = []
         
@@ -229,47 +348,156 @@ class ColorEmotionVisualizer:
         print(f"🎨 Chart types: Sankey, Icicle, Combined")
         print("-" * 50)
         
-        for i, metric in enumerate(self.numeric_columns, 1):
-            print(f"📈 Processing metric {i}/{len(self.numeric_columns)}: {metric}")
-            
-            # Create safe filename
-            safe_metric = metric.replace(' ', '_').replace('(', '').replace(')', '').replace('%', 'pct').replace(',', '')
-            
+        # Shared plotly.js written before the pages
+        self.plotlyjs_reference()
+        
+        build = BuildManifest(os.path.join(self.output_dir, 'build_manifest.json'), force=force)
+        digests = {metric: self.metric_hash(metric) for metric in self.numeric_columns}
+        fresh = {metric for metric, digest in digests.items() if build.is_fresh(metric, digest)}
+        if fresh:
+            print(f"♻️ Unchanged metrics kept from the previous run: {len(fresh)}")
+        jobs = [(metric, timestamp) for metric in self.numeric_columns if metric not in fresh]
+        
+        if n_workers is not None and n_workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            global _WORKER_VISUALIZER
+            _WORKER_VISUALIZER = self
             try:
-                # Create and save Sankey chart
-                sankey_fig = self.create_sankey_chart(metric)
-                sankey_filename = f"sankey_{safe_metric}_{timestamp}.html"
-                sankey_filepath = os.path.join(self.output_dir, sankey_filename)
-                sankey_fig.write_html(sankey_filepath, include_plotlyjs=True)
-                saved_files.append(sankey_filepath)
-                print(f"   ✅ Sankey saved: {sankey_filename}")
-                
-                # Create and save Icicle chart
-                icicle_fig = self.create_icicle_chart(metric)
-                icicle_filename = f"icicle_{safe_metric}_{timestamp}.html"
-                icicle_filepath = os.path.join(self.output_dir, icicle_filename)
-                icicle_fig.write_html(icicle_filepath, include_plotlyjs=True)
-                saved_files.append(icicle_filepath)
-                print(f"   ✅ Icicle saved: {icicle_filename}")
-                
-                # Create and save Combined chart
-                combined_fig = self.create_combined_chart(metric)
-                combined_filename = f"combined_{safe_metric}_{timestamp}.html"
-                combined_filepath = os.path.join(self.output_dir, combined_filename)
-                combined_fig.write_html(combined_filepath, include_plotlyjs=True)
-                saved_files.append(combined_filepath)
-                print(f"   ✅ Combined saved: {combined_filename}")
-                
-            except Exception as e:
-                print(f"   ❌ Error with metric '{metric}': {str(e)}")
+                with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                    results = list(pool.map(_save_metric_charts_worker, jobs))
+            finally:
+                _WORKER_VISUALIZER = None
+        else:
+            results = []
+            for job in jobs:
+                print(f"📈 Processing metric {len(results) + 1}/{len(jobs)}: {job[0]}")
+                results.append(_save_metric_charts(self, job))
+        
+        built = {}
+        superseded = set()
+        for metric, entries, error in results:
+            if error is not None:
+                print(f"   ❌ Error with metric '{metric}': {error}")
+                continue
+            files = [os.path.join(self.output_dir, entry['file']) for entry in entries]
+            for entry in entries:
+                print(f"   ✅ {entry['chart'].capitalize()} saved: {entry['file']}")
+            saved_files.extend(files)
+            superseded.update(os.path.abspath(file) for file in build.files(metric))
+            build.record(metric, digests[metric], files, charts=entries)
+            built[metric] = entries
+        for metric in [metric for metric in build.entries if metric not in digests]:
+            superseded.update(os.path.abspath(file) for file in build.files(metric))
+            del build.entries[metric]
+        build.save()
+        
+        # Pages of the previous runs replaced by this one (same name when the timestamp did not change: kept)
+        removed = remove_outputs(superseded - {os.path.abspath(file) for file in saved_files})
+        if removed:
+            print(f"🧹 Superseded files removed: {removed}")
+        
+        # Metric order, pages of the unchanged metrics included
+        manifest = []
+        for metric in self.numeric_columns:
+            if metric in built:
+                manifest.extend(built[metric])
+            elif metric in fresh:
+                manifest.extend(build.entries[metric]['charts'])
+        
+        manifest_path = os.path.join(self.output_dir, f"charts_manifest_{timestamp}.json")
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'timestamp': timestamp,
+                'include_plotlyjs': str(self.plotlyjs_reference()),
+                'charts': manifest
+            }, f, indent=2)
+        remove_outputs(path for path in self.charts_manifests() if path != manifest_path)
         
         print("-" * 50)
         print(f"🎉 Generation complete!")
         print(f"📄 Total files saved: {len(saved_files)}")
+        print(f"🧾 Manifest: {manifest_path}")
         print(f"📁 Location: {os.path.abspath(self.output_dir)}")
         
         return saved_files
     
+    def save_metric_explorer(self):
+        """
+        Single page with the Sankey and icicle charts of every metric: the nodes / links are embedded once (figures of
+        the first metric) and each metric only adds its value vectors, switched in the browser with Plotly.restyle.
+        """
+        if not self.numeric_columns:
+            print("❌ No numeric columns found for visualization!")
+            return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        default_metric = self.numeric_columns[0]
+        
+        metric_options = ""
+        for i, metric in enumerate(self.numeric_columns):
+            selected = "selected" if i == 0 else ""
+            metric_options += f'<option value="{metric}" {selected}>{metric}</option>\n'
+        
+        # Value vectors only, in the order of the links / nodes of the embedded figures
+        metric_values = ((metric, {
+            'sankey': self.sankey_trace(metric)['link']['value'].tolist(),
+            'icicle': self.icicle_trace(metric)['values'].tolist()
+        }) for metric in self.numeric_columns)
+        
+        filename = f"explorer_{timestamp}.html"
+        filepath = os.path.join(self.output_dir, filename)
+        StreamingTemplate("metric_explorer.html").write(
+            filepath,
+            metric_options=metric_options,
+            sankey_div=self.create_sankey_chart(default_metric).to_html(
+                full_html=False, include_plotlyjs=self.plotlyjs_reference(), div_id='sankey-chart'),
+            icicle_div=self.create_icicle_chart(default_metric).to_html(
+                full_html=False, include_plotlyjs=False, div_id='icicle-chart'),
+            js_decoder=JS_DECODER,
+            metric_values=json_object_chunks(metric_values, encode_payload)
+        )
+        
+        print(f"✅ Explorer saved ({len(self.numeric_columns)} metrics): {filename}")
+        return filepath
+    
+    def charts_manifests(self):
+        """Paths of the charts_manifest_<timestamp>.json files of output_dir, oldest first"""
+        return sorted(os.path.join(self.output_dir, name) for name in os.listdir(self.output_dir)
+                      if name.startswith('charts_manifest_') and name.endswith('.json'))
+    
+    def current_files(self, extra=()):
+        """
+        Files of the current build: the pages recorded in build_manifest.json for the metrics of the data, the latest
+        charts manifest, the build manifest and the shared plotly.js, plus extra (pages written outside of the build,
+        e.g. the explorer). Older timestamped pages are not part of it.
+        """
+        build_path = os.path.join(self.output_dir, 'build_manifest.json')
+        build = BuildManifest(build_path)
+        files = [str(file) for metric in self.numeric_columns for file in build.files(metric)]
+        files += self.charts_manifests()[-1:] + [build_path] + list(extra)
+        
+        reference = self.plotlyjs_reference()
+        if isinstance(reference, str) and reference.endswith('.js'):
+            files.append(os.path.join(self.output_dir, reference))
+        return [file for file in dict.fromkeys(files) if os.path.exists(file)]
+    
+    def publish_static(self, files=None):
+        """
+        Precompress the current files (see current_files) and write output_dir/static_manifest.json listing exactly
+        them: superseded pages are dropped from it (with their compressed siblings). The chart pages have timestamped
+        names and get a long-lived cache, like plotly-<version>.min.js; the build manifest and a custom bundle keep their
+        name and are revalidated.
+        """
+        files = self.current_files() if files is None else files
+        stable = [os.path.join(self.output_dir, 'build_manifest.json')]
+        if self.plotlyjs_bundle is not None:
+            stable.append(os.path.join(self.output_dir, os.path.basename(self.plotlyjs_bundle)))
+        manifest_path = build_static_manifest(self.output_dir, files, revalidate=stable, prune=True)
+        
+        sizes = compression_summary(manifest_path)
+        print("🗜️ Precompressed: " + ", ".join(f"{size / 1024 / 1024:.2f} MB {encoding}" for encoding, size in sizes.items()))
+        print(f"🧾 Static manifest: {manifest_path}")
+        return manifest_path
+    
     def save_default_charts(self):
         """Save charts with default metric"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -295,8 +523,7 @@ class ColorEmotionVisualizer:
             saved_files = []
             for chart_type, fig in charts.items():
                 filename = f"{chart_type}_default_{timestamp}.html"
-                filepath = os.path.join(self.output_dir, filename)
-                fig.write_html(filepath, include_plotlyjs=True)
+                filepath = self.write_figure(fig, filename)
                 saved_files.append(filepath)
                 print(f"✅ {chart_type.capitalize()} chart saved: {filename}")
             
@@ -346,17 +573,27 @@ def main():
         print("\nChoose what to generate:")
         print("1. Default charts (3 charts with first available metric)")
         print(f"2. All charts for all metrics ({len(visualizer.numeric_columns) * 3} charts total)")
+        print(f"3. Single-page explorer (all {len(visualizer.numeric_columns)} metrics in one file)")
         
-        choice = input("\nEnter your choice (1 or 2) [default: 1]: ").strip()
+        choice = input("\nEnter your choice (1, 2 or 3) [default: 1]: ").strip()
         
         if choice == "2":
-            # Generate all charts for all metrics
-            saved_files = visualizer.save_all_charts_for_all_metrics()
+            # Generate all charts for all metrics (one worker process per core)
+            saved_files = visualizer.save_all_charts_for_all_metrics(n_workers=os.cpu_count())
+        elif choice == "3":
+            # One page, metric switched in the browser
+            explorer = visualizer.save_metric_explorer()
+            saved_files = [explorer] if explorer else []
         else:
             # Generate default charts
             saved_files = visualizer.save_default_charts()
         
-        if saved_files:
+        # Current build (unchanged metrics included, even when nothing was rebuilt) + the pages written by this run
+        published = visualizer.current_files(saved_files)
+        if published and PRECOMPRESS_OUTPUT:
+            visualizer.publish_static(published)
+        
+        if published:
             print(f"\n🎯 All files saved in: {os.path.abspath(visualizer.output_dir)}")
             print("🌐 Open any HTML file in your web browser to view the interactive charts!")
         
@@ -0,0 +1,81 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pathlib
+import json
+import re
+import io
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+TEMPLATE_DIR = pathlib.Path(__file__).parent / "templates"
+
+# {{ name }} : emplacement rempli au rendu (les accolades simples du CSS / JS restent telles quelles)
+SLOT = re.compile(r"\{\{ (\w+) \}\}")
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def json_object_chunks(items, encode=None):
+    """
+        Stream a JSON object one member at a time: items is an iterable of (key, value) and encode an optional function
+        applied to each value just before it is serialized. Only one member is in memory at once.
+    """
+    yield "{"
+    for i, (key, value) in enumerate(items):
+        if encode is not None:
+            value = encode(value)
+        yield (", " if i else "") + json.dumps(key) + ": " + json.dumps(value)
+    yield "}"
+
+
+#%%
+####################################################################################################################################
+# CLASSES
+####################################################################################################################################
+
+class StreamingTemplate:
+    """
+        HTML page split once into literal parts and {{ name }} slots, then written part by part.
+        A slot value is either a string or an iterable of strings (e.g. json_object_chunks), so a big data payload is
+        written chunk by chunk instead of being interpolated into one giant string.
+    """
+    def __init__(self, name, template_dir=TEMPLATE_DIR):
+        text = (pathlib.Path(template_dir) / name).read_text(encoding="utf-8")
+        parts = SLOT.split(text)
+        # Indices pairs = texte littéral, impairs = nom d'emplacement
+        self.literals = parts[0::2]
+        self.slots = parts[1::2]
+
+    def stream(self, f, **values):
+        missing = set(self.slots) - set(values)
+        if missing:
+            raise KeyError(f"Missing template values: {sorted(missing)}")
+
+        for literal, slot in zip(self.literals, self.slots + [None]):
+            f.write(literal)
+            if slot is None:
+                continue
+            value = values[slot]
+            if isinstance(value, str):
+                f.write(value)
+            else:
+                for chunk in value:
+                    f.write(chunk)
+
+    def write(self, path, **values):
+        with open(path, "w", encoding="utf-8") as f:
+            self.stream(f, **values)
+
+    def render(self, **values):
+        """Whole page as a string (small pages, notebooks)"""
+        buffer = io.StringIO()
+        self.stream(buffer, **values)
+        return buffer.getvalue()
@@ -0,0 +1,162 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import plotly.graph_objects as go
+import plotly.io as pio
+import pathlib
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from html_template import StreamingTemplate
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+FORMATS = ("png", "svg")
+SCALE = 2 # Résolution des PNG pour les présentations
+
+# Nombre de processus d'export (None = un par coeur): chacun ouvre une seule session kaleido pour tout son lot
+N_WORKERS = None
+
+DEFAULT_X = "Respondent count (fixation dwells)"
+DEFAULT_Y = "Dwell time (fixation, ms)"
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def _write_batch(batch):
+    """One kaleido session for a whole batch: [(figure dict, [paths])] -> written paths"""
+    figures, paths = [], []
+    for fig, files in batch:
+        for file in files:
+            figures.append(fig)
+            paths.append(file)
+    # Les figures ont déjà été validées par plotly à leur construction
+    pio.write_images(figures, paths, scale=SCALE, validate=False)
+    return paths
+
+
+def export_images(figures, out_dir, formats=FORMATS, n_workers=N_WORKERS):
+    """
+        Write every figure of {name: figure} as out_dir/<name>.<format>.
+        Figures are exported in bulk (plotly.io.write_images keeps one renderer session for a whole batch instead of one
+        per image) and the batches are spread over a process pool. Returns {name: {format: path}}.
+    """
+    out_dir = pathlib.Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    files = {name: {fmt: out_dir / f"{name}.{fmt}" for fmt in formats} for name in figures}
+    jobs = [(fig.to_dict() if isinstance(fig, go.Figure) else fig, list(files[name].values())) for name, fig in figures.items()]
+
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    n_workers = max(1, min(n_workers, len(jobs)))
+    if n_workers == 1:
+        _write_batch(jobs)
+    else:
+        batches = [jobs[i::n_workers] for i in range(n_workers)]
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            list(pool.map(_write_batch, batches))
+
+    return files
+
+
+def write_contact_sheet(files, out_dir, title="Charts"):
+    """index.html next to the images: one thumbnail per figure (first format) with links to every format"""
+    out_dir = pathlib.Path(out_dir)
+    cards = []
+    for name, by_format in files.items():
+        formats = list(by_format.values())
+        links = " · ".join(f'<a href="{html.escape(path.name)}">{path.suffix[1:].upper()}</a>' for path in formats)
+        cards.append(f'<figure><a href="{html.escape(formats[0].name)}"><img src="{html.escape(formats[0].name)}" '
+                     f'loading="lazy" alt="{html.escape(name)}"></a><figcaption>{html.escape(name)}<br>{links}</figcaption></figure>\n')
+
+    path = out_dir / "index.html"
+    StreamingTemplate("contact_sheet.html").write(path, title=html.escape(title), count=str(len(cards)), cards=cards)
+    return path
+
+
+def bubble_figures(analyzer, x_metric=DEFAULT_X, y_metric=DEFAULT_Y, details=False):
+    """
+        Static versions of the bubble diagram views for one (X, Y) pair: one overview per feeling and, with details,
+        one detail view per colour family. Same markers, colours and titles as the interactive page.
+    """
+    axis = dict(showgrid=True, gridwidth=2, gridcolor='#e0e0e0', zeroline=True, zerolinecolor='#d0d0d0', zerolinewidth=2)
+    layout = dict(height=600, width=1000, showlegend=False, plot_bgcolor='#DBDBDB', paper_bgcolor='#ffffff')
+
+    figures = {}
+    for i, feeling in enumerate(analyzer.all_feelings_data):
+        data, _ = analyzer.process_feeling_with_metrics(feeling, x_metric, y_metric)
+        prefix = f"bubbles_{i:02d}_{feeling}"
+
+        fig = go.Figure([go.Scatter(
+            x=[group_data['center_x']], y=[group_data['center_y']],
+            mode='markers+text',
+            marker=dict(size=group_data['marker_size'], color=group_data['color'], opacity=1, line=dict(width=4, color='#DBDBDB')),
+            text=[group_data['choice']], textposition='middle center',
+            textfont=dict(color='#808080', size=16, family='Arial Black'),
+            name=group
+        ) for group, group_data in data.items()])
+        fig.update_layout(title=f"{y_metric} vs {x_metric} for {feeling}",
+                          xaxis=dict(title=x_metric, **axis), yaxis=dict(title=y_metric, **axis), **layout)
+        figures[prefix] = fig
+
+        if not details:
+            continue
+        for group, group_data in data.items():
+            fig = go.Figure(go.Scatter(
+                x=group_data['detail_x'], y=group_data['detail_y'],
+                mode='markers+text', text=group_data['detail_names'], textposition='bottom center',
+                textfont=dict(color='#808080', size=10, family='Arial Black'),
+                marker=dict(size=group_data['detail_size'], color=group_data['detail_color'], opacity=1, line=dict(width=1, color='#DBDBDB'))
+            ))
+            fig.update_layout(title=f"{group} Details ({len(group_data['detail_x'])} points) - {feeling}",
+                              xaxis=dict(title=x_metric, **axis), yaxis=dict(title=y_metric, **axis), **layout)
+            figures[f"{prefix}_{group}"] = fig
+
+    return figures
+
+
+def feeling_viz_figures(visualizer):
+    """Sankey, icicle and combined figures of every metric, named like the HTML pages of feeling_viz"""
+    figures = {}
+    for metric in visualizer.numeric_columns:
+        for chart_type, fig in visualizer.metric_charts(metric).items():
+            figures[f"{chart_type}_{visualizer.safe_name(metric)}"] = fig
+    return figures
+
+
+#%%
+####################################################################################################################################
+# MAIN
+####################################################################################################################################
+
+def main():
+    from bubbles_diagram import PreprocessedFlexibleFeelingsAnalyzer
+    from feeling_viz import ColorEmotionVisualizer
+
+    parent_path = pathlib.Path(__file__).parent.parent # Chemin parent du dossier (Emoskin)
+    out_dir = parent_path / "Results" / "Images"
+
+    visualizer = ColorEmotionVisualizer(str(parent_path / "Results" / "Tableaux" / "Feelings" / "Feelings.xlsx"))
+    analyzer = PreprocessedFlexibleFeelingsAnalyzer()
+
+    figures = {**feeling_viz_figures(visualizer), **bubble_figures(analyzer, details=True)}
+    print(f"🖼️ Exporting {len(figures)} figures as {', '.join(FORMATS)}...")
+    files = export_images(figures, out_dir)
+
+    contact_sheet = write_contact_sheet(files, out_dir, title="Emoskin charts")
+    with open(out_dir / "images_manifest.json", "w", encoding="utf-8") as f:
+        json.dump({name: {fmt: path.name for fmt, path in by_format.items()} for name, by_format in files.items()}, f, indent=2)
+    print(f"✅ Contact sheet: {contact_sheet}")
+
+
+if __name__ == "__main__":
+    main()
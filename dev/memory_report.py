@@ -0,0 +1,79 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import numpy as np
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+MB = 1024 * 1024
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def deep_sizeof(obj, seen=None):
+    """
+        Recursive size in bytes of nested dicts / lists / tuples / sets, numpy arrays (buffer included) and pandas
+        objects (memory_usage(deep=True), i.e. with the Python strings of object columns).
+        Objects referenced several times are counted once.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        size = sys.getsizeof(obj)
+        # Une vue ne possède pas son buffer: getsizeof ne le compte pas
+        return size + (obj.nbytes if obj.base is not None else 0)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+@contextmanager
+def track_phase(phases, name):
+    """
+        Record the duration and, when tracemalloc is tracing, the allocations still alive at the end of the phase and
+        the peak reached during it: phases[name] = {"seconds", "current_bytes", "peak_bytes"}.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase = {"seconds": round(time.perf_counter() - start, 3)}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            phase["current_bytes"] = current - start_current
+            phase["peak_bytes"] = peak - start_current
+        phases[name] = phase
+
+
+def report_frame(report):
+    """Per-feeling part of a memory report as a DataFrame (MB), with a Total line"""
+    res = pd.DataFrame.from_dict(report["feelings"], orient="index") / MB
+    res.loc["Total"] = res.sum()
+    return res.round(3)
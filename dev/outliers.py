@@ -0,0 +1,115 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import numpy as np
+import pathlib
+
+from et_dataset import load_et, annotate_labels
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+col_fix = "Fixation count"
+col_dur = "Duration of average fixation"
+col_ttff = "TTFF (AOI)"
+col_dt = "Dwell time (fixation, ms)"
+col_clicks = "Mouse click count"
+OUTLIER_METRICS = [col_fix, col_dur, col_ttff, col_dt, col_clicks]
+
+# Une ligne par (phase, feeling, shade) au plus: les scores sont calculés au niveau de la famille de couleur
+GROUP_KEYS = ["Phase", "Feeling", "Colour"]
+# En dessous, la médiane et la MAD ne veulent rien dire: le groupe n'est pas évalué (score 0, jamais marqué)
+MIN_GROUP_SIZE = 5
+
+# Seuil classique d'Iglewicz et Hoaglin pour le z-score modifié
+THRESHOLD = 3.5
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def _group_scale(values, by, min_size=MIN_GROUP_SIZE):
+    """
+        Median and robust scale MAD / 0.6745 of every metric inside its group, aligned with the rows. The scale is NaN
+        for groups smaller than min_size and when the MAD is 0 (more than half of the group shares one value).
+    """
+    grouped = values.groupby(by, dropna=False)
+    median = grouped.transform("median")
+    mad = (values - median).abs().groupby(by, dropna=False).transform("median")
+    scale = (mad / 0.6745).replace(0, np.nan)
+    small = grouped[values.columns[0]].transform("size") < min_size
+    return median, scale.mask(small, np.nan)
+
+
+def robust_zscores(et, metrics=OUTLIER_METRICS, keys=GROUP_KEYS, min_size=MIN_GROUP_SIZE):
+    """
+        Modified z-score (x - median) / scale of every metric inside its (phase, feeling, colour) group, see _group_scale.
+        Groups smaller than min_size or with a MAD of 0 are not scored (0, never flagged).
+    """
+    values = et[metrics]
+    median, scale = _group_scale(values, [et[key] for key in keys], min_size)
+    return ((values - median) / scale).fillna(0.0)
+
+
+def flag_outliers(et, metrics=OUTLIER_METRICS, keys=GROUP_KEYS, threshold=THRESHOLD, min_size=MIN_GROUP_SIZE):
+    """One boolean column per metric plus "Outlier" (any metric), aligned with the rows of et"""
+    flags = robust_zscores(et, metrics, keys, min_size).abs() > threshold
+    flags.columns = [f"Outlier {metric}" for metric in metrics]
+    flags["Outlier"] = flags.any(axis=1)
+    return flags
+
+
+def winsorize(et, metrics=OUTLIER_METRICS, keys=GROUP_KEYS, threshold=THRESHOLD, min_size=MIN_GROUP_SIZE):
+    """Copy of et where each metric is clipped to median ± threshold * scale of its group (groups not scored are left as-is)"""
+    values = et[metrics]
+    median, scale = _group_scale(values, [et[key] for key in keys], min_size)
+    half_width = threshold * scale
+
+    res = et.copy()
+    res[metrics] = values.clip(lower=(median - half_width).fillna(-np.inf), upper=(median + half_width).fillna(np.inf))
+    return res
+
+
+def outlier_mask(flags, index, metrics=None):
+    """
+        Boolean mask of the rows to keep: df[outlier_mask(flags, df.index)] excludes the outliers of any aggregation
+        without recomputing the scores. Rows absent from the flags are kept.
+    """
+    columns = ["Outlier"] if metrics is None else [f"Outlier {metric}" for metric in metrics]
+    return ~flags[columns].any(axis=1).reindex(index, fill_value=False)
+
+
+def save_flags(flags, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    flags.to_excel(path)
+
+
+def load_flags(path):
+    return pd.read_excel(path, index_col=0)
+
+
+#%%
+####################################################################################################################################
+# MAIN
+####################################################################################################################################
+
+def main():
+    parent_path = pathlib.Path(__file__).parent.parent # Chemin parent du dossier (Emoskin)
+    et = annotate_labels(load_et(parent_path))
+
+    flags = flag_outliers(et)
+    print(f"{int(flags['Outlier'].sum())} lignes aberrantes sur {len(flags)}")
+
+    # L'index est celui des lignes de ET_modified.xlsx: les scripts tri_* peuvent appliquer le masque directement
+    save_flags(et[["Parent Label", "Label_modified"]].join(flags),
+               parent_path / "Results" / "Tableaux" / "Outliers" / "outlier_flags.xlsx")
+
+
+if __name__ == "__main__":
+    main()
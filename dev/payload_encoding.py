@@ -0,0 +1,97 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import numpy as np
+import base64
+import numbers
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+MIN_LENGTH = 16 # Les petites listes restent en JSON, l'enveloppe coûterait plus cher que le gain
+UINT16_MISSING = 65535
+
+# Decoder to paste in the <script> of a generated page: decodeTypedPayload(JSON) returns the same structure with the
+# encoded lists replaced by typed arrays (missing values become NaN)
+JS_DECODER = """
+        function decodeTypedArray(node) {
+            const binary = atob(node.b64);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+            if (node.__typed__ === 'float32') return new Float32Array(bytes.buffer);
+            if (node.__typed__ === 'float64') return new Float64Array(bytes.buffer);
+            const codes = new Uint16Array(bytes.buffer);
+            if (node.step === undefined) return codes;
+            const values = new Float64Array(codes.length);
+            for (let i = 0; i < codes.length; i++) {
+                values[i] = codes[i] === 65535 ? NaN : node.offset + codes[i] * node.step;
+            }
+            return values;
+        }
+
+        function decodeTypedPayload(node) {
+            if (Array.isArray(node)) return node.map(decodeTypedPayload);
+            if (node === null || typeof node !== 'object') return node;
+            if (node.__typed__) return decodeTypedArray(node);
+            for (const key in node) node[key] = decodeTypedPayload(node[key]);
+            return node;
+        }
+"""
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def _b64(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
+
+def encode_array(values, precision=None):
+    """
+        Pack a list of numbers (None / NaN allowed) as base64:
+        - non-negative integers below 65535 -> Uint16
+        - with precision (number of decimals shown in the plot) -> Uint16 codes of offset + k * 10**-precision when the
+          range fits, the values are then rounded to that precision
+        - otherwise -> Float32 when every value survives the round trip unchanged, Float64 (lossless) when it does not
+          (values above ~1e6, or with more significant digits than Float32 keeps)
+    """
+    array = np.array([np.nan if v is None else v for v in values], dtype=float)
+    missing = np.isnan(array)
+
+    if not missing.any() and np.all(array == np.round(array)) and array.min(initial=0) >= 0 and array.max(initial=0) < UINT16_MISSING:
+        return {"__typed__": "uint16", "b64": _b64(array.astype("<u2"))}
+
+    if precision is not None and not missing.all():
+        step = 10.0 ** -precision
+        offset = float(np.round(np.nanmin(array), precision))
+        codes = np.round((array - offset) / step)
+        if np.nanmax(codes) < UINT16_MISSING:
+            codes = np.where(missing, UINT16_MISSING, codes).astype("<u2")
+            return {"__typed__": "uint16", "b64": _b64(codes), "offset": offset, "step": step}
+
+    single = array.astype("<f4")
+    if np.array_equal(single.astype(float), array, equal_nan=True):
+        return {"__typed__": "float32", "b64": _b64(single)}
+    return {"__typed__": "float64", "b64": _b64(array.astype("<f8"))}
+
+
+def _is_numeric_list(values):
+    return (len(values) >= MIN_LENGTH
+            and all(v is None or (isinstance(v, numbers.Real) and not isinstance(v, bool)) for v in values)
+            and any(v is not None for v in values))
+
+
+def encode_payload(node, precision=None):
+    """Copy of a JSON-like structure where every long list of numbers is replaced by its typed-array encoding"""
+    if isinstance(node, dict):
+        return {key: encode_payload(value, precision) for key, value in node.items()}
+    if isinstance(node, (list, tuple)):
+        if _is_numeric_list(node):
+            return encode_array(node, precision)
+        return [encode_payload(value, precision) for value in node]
+    return node
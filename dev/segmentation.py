@@ -0,0 +1,127 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import numpy as np
+import pathlib
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from et_dataset import load_et, annotate_labels
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def respondent_features(survey, et=None, metrics=None, respondent_col="Respondent ID"):
+    """
+        One row per respondent: ratio of each colour family in their choices (Whites: 17%, ...) and, when the ET table
+        is given, the mean ET metrics of the shades they picked (joined on (feeling, shade)).
+    """
+    ratios = pd.crosstab(survey[respondent_col], survey["Choice"], normalize="index")
+    ratios.columns = [f"% {col}" for col in ratios.columns]
+
+    if et is None:
+        return ratios
+
+    et = et.loc[et["Phase"] == "P2d"]
+    if metrics is None:
+        metrics = et.select_dtypes(include=[np.number]).columns.tolist()
+    et_by_shade = et.groupby(["Feeling", "Shade"])[metrics].mean()
+
+    answers = survey[[respondent_col, "Word_EmotionOrBenefit", "OA Name"]]
+    answers = answers.join(et_by_shade, on=["Word_EmotionOrBenefit", "OA Name"])
+    et_features = answers.groupby(respondent_col)[metrics].mean()
+
+    return ratios.join(et_features, how="left")
+
+
+def choose_segments(features, k_range=range(2, 9), sample_size=2000, random_state=0, batch_size=1024):
+    """
+        Mini-batch k-means for every k in k_range; k is chosen with the silhouette score computed on a sample.
+        Returns the segment of every respondent and the score of every k.
+        With too few respondents for any k of k_range (silhouette needs k < n), everyone is in segment 0 and the
+        scores are empty. A k whose clustering collapses to a single label on the sample is skipped (no score).
+    """
+    X = StandardScaler().fit_transform(features.fillna(features.mean()).fillna(0))
+    # Même échantillon pour tous les k: les scores restent comparables
+    sample = np.random.default_rng(random_state).permutation(len(X))[:min(sample_size, len(X))]
+
+    scores = {}
+    labels = {}
+    for k in k_range:
+        if k >= len(X):
+            break
+        model = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, n_init=3, random_state=random_state).fit(X)
+        n_labels = len(set(model.labels_[sample]))
+        if n_labels < 2 or n_labels >= len(sample):
+            continue
+        labels[k] = model.labels_
+        scores[k] = silhouette_score(X[sample], model.labels_[sample])
+
+    scores = pd.Series(scores, name="Silhouette", dtype=float).rename_axis("k")
+    if scores.empty:
+        return pd.Series(0, index=features.index, name="Segment"), scores
+
+    segments = pd.Series(labels[scores.idxmax()], index=features.index, name="Segment")
+
+    return segments, scores
+
+
+def save_segments(segments, scores, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with pd.ExcelWriter(path) as writer:
+        segments.to_excel(writer, sheet_name="Segments")
+        scores.to_excel(writer, sheet_name="Silhouette")
+
+
+def load_segments(path):
+    return pd.read_excel(path, sheet_name="Segments", index_col=0)["Segment"]
+
+
+def split_by_segment(df, segments, by, values=None, agg="count", respondent_col="Respondent ID"):
+    """
+        Same aggregation as the existing tables but with the segment as an extra column level.
+        The segment is attached with an index lookup and everything is done in a single groupby, without one pass per segment.
+        values=None counts rows (like the survey click counts of Feelings.xlsx and fixations_by_shade.xlsx).
+    """
+    segment = segments.reindex(df[respondent_col]).to_numpy()
+    grouped = df.assign(Segment=segment).groupby(by + ["Segment"])
+
+    if values is None:
+        res = grouped.size()
+    else:
+        res = grouped[values].agg(agg)
+
+    return res.unstack("Segment", fill_value=0)
+
+
+#%%
+####################################################################################################################################
+# MAIN
+####################################################################################################################################
+
+def main():
+    parent_path = pathlib.Path(__file__).parent.parent # Chemin parent du dossier (Emoskin)
+    survey = pd.read_excel(parent_path / "Files" / "survey.xlsx", sheet_name="Full Survey Response")
+    et = annotate_labels(load_et(parent_path))
+
+    metrics = ["Fixation count", "Duration of average fixation", "TTFF (AOI)", "Dwell time (fixation, ms)"]
+    features = respondent_features(survey, et, metrics)
+    segments, scores = choose_segments(features)
+    print(f"{segments.nunique()} segments retenus (silhouette = {scores.max():.3f})")
+
+    res_path = parent_path / "Results" / "Tableaux" / "Segments"
+    save_segments(segments, scores, res_path / "segments.xlsx")
+
+    # Nombre de clics par shade (colonne "count" de fixations_by_shade.xlsx) et par feeling / famille (Feelings.xlsx)
+    split_by_segment(survey, segments, ["OA Name"]).to_excel(res_path / "fixations_by_shade_by_segment.xlsx")
+    split_by_segment(survey, segments, ["Word_EmotionOrBenefit", "Choice"]).to_excel(res_path / "Feelings_by_segment.xlsx")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import pandas as pd
+import numpy as np
+import json
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+col_ttff = "TTFF (AOI)"
+col_dt = "Dwell time (fixation, ms)"
+SKETCH_METRICS = [col_ttff, col_dt]
+
+SKETCH_LEVELS = {
+    "shade": "Shade",
+    "feeling": "Feeling",
+    "colour": "Colour",
+}
+
+
+#%%
+####################################################################################################################################
+# CLASSES
+####################################################################################################################################
+
+class KLLSketch:
+    """
+        Mergeable quantile sketch (KLL). Memory is O(k) whatever the number of values, quantiles have a rank error of
+        roughly 1/k, and two sketches built on different rows can be merged as if they had seen all of them.
+        Exact as long as fewer than k values were added.
+    """
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                items = np.sort(items)
+                # Un élément sur deux monte d'un niveau (poids x2), l'éventuel élément impair reste sur place
+                even = len(items) - len(items) % 2
+                offset = int(self._rng.integers(2))
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], items[offset:even:2]])
+                self.compactors[level] = items[even:]
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """q can be a float or an array of floats in [0, 1]"""
+        values = np.concatenate(self.compactors)
+        if len(values) == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.compactors)])
+        order = np.argsort(values)
+        cum = np.cumsum(weights[order])
+        ranks = np.asarray(q) * cum[-1]
+        idx = np.minimum(np.searchsorted(cum, ranks, side="left"), len(cum) - 1)
+        return values[order][idx]
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n, "compactors": [items.tolist() for items in self.compactors]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.compactors = [np.asarray(items, dtype=float) for items in data["compactors"]]
+        return sketch
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def build_sketches(et, metrics=SKETCH_METRICS, levels=SKETCH_LEVELS, k=200, sketches=None):
+    """
+        One sketch per (level, group, metric) from rows annotated by et_dataset.annotate_labels.
+        Passing existing sketches adds the new rows to them (ingestion of a new batch of respondents).
+    """
+    sketches = {} if sketches is None else sketches
+    for level, key in levels.items():
+        level_sketches = sketches.setdefault(level, {})
+        for group, rows in et.dropna(subset=[key]).groupby(key):
+            group_sketches = level_sketches.setdefault(group, {})
+            for metric in metrics:
+                group_sketches.setdefault(metric, KLLSketch(k=k)).update(rows[metric].to_numpy())
+    return sketches
+
+
+def save_sketches(sketches, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {level: {group: {metric: sketch.to_dict() for metric, sketch in by_metric.items()}
+                    for group, by_metric in by_group.items()}
+            for level, by_group in sketches.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def load_sketches(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {level: {group: {metric: KLLSketch.from_dict(sketch) for metric, sketch in by_metric.items()}
+                    for group, by_metric in by_group.items()}
+            for level, by_group in data.items()}
+
+
+def quantile_table(sketches, level="shade"):
+    """Médiane, P90 et IQR de chaque métrique pour un niveau, sans relire les lignes brutes"""
+    rows = {}
+    for group, by_metric in sketches[level].items():
+        row = {}
+        for metric, sketch in by_metric.items():
+            q25, q50, q75, q90 = sketch.quantile([0.25, 0.5, 0.75, 0.9])
+            row[f"Médiane de {metric}"] = q50
+            row[f"P90 de {metric}"] = q90
+            row[f"IQR de {metric}"] = q75 - q25
+        rows[group] = row
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis(SKETCH_LEVELS.get(level, level)).sort_index()
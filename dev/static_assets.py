@@ -0,0 +1,167 @@
+#%%
+####################################################################################################################################
+# LIBRARIES
+####################################################################################################################################
+import gzip
+import hashlib
+import json
+import mimetypes
+import pathlib
+from datetime import datetime
+
+# Optionnel: sans le paquet brotli, seules les versions .gz sont écrites
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+#%%
+####################################################################################################################################
+# CONSTANTS
+####################################################################################################################################
+MANIFEST_NAME = "static_manifest.json"
+
+# Texte qui vaut la peine d'être compressé (les shards .json.gz le sont déjà et restent des fichiers à part entière)
+COMPRESSIBLE = {".html", ".js", ".json", ".css", ".svg", ".csv", ".txt"}
+MIN_BYTES = 1024
+
+# Fichiers dont le nom ne change pas d'une génération à l'autre: revalidés (ETag); le reste (noms horodatés) est mis en cache un an
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+#%%
+####################################################################################################################################
+# FUNCTIONS
+####################################################################################################################################
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_type(path):
+    """MIME type of a file; already compressed files (the .json.gz shards) are served as-is, without Content-Encoding"""
+    mime, encoding = mimetypes.guess_type(pathlib.Path(path).name)
+    if encoding == "gzip":
+        return "application/gzip"
+    return mime or "application/octet-stream"
+
+
+def precompress(path, gzip_level=9, brotli_quality=11):
+    """
+        Write path.gz (and path.br when brotli is installed) next to path, returns {encoding: (sibling, bytes)}.
+        The gzip header has no name / timestamp, so identical inputs give identical bytes.
+    """
+    path = pathlib.Path(path)
+    data = path.read_bytes()
+
+    variants = {}
+    sibling = path.with_name(path.name + ".gz")
+    with open(sibling, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=gzip_level, mtime=0) as f:
+        f.write(data)
+    variants["gzip"] = (sibling, sibling.stat().st_size)
+
+    if brotli is not None:
+        sibling = path.with_name(path.name + ".br")
+        sibling.write_bytes(brotli.compress(data, quality=brotli_quality))
+        variants["br"] = (sibling, sibling.stat().st_size)
+    return variants
+
+
+def _is_sibling(path, min_bytes=MIN_BYTES):
+    """
+        True for a .gz / .br written by precompress: its uncompressed counterpart exists and is one precompress handles.
+        The .json.gz shards have no .json counterpart and are listed as assets.
+    """
+    if path.suffix not in (".gz", ".br"):
+        return False
+    source = path.with_suffix("")
+    return source.suffix in COMPRESSIBLE and source.is_file() and source.stat().st_size >= min_bytes
+
+
+def remove_outputs(paths):
+    """Delete superseded outputs together with their .gz / .br siblings, returns the number of files removed"""
+    removed = 0
+    for path in map(pathlib.Path, paths):
+        for file in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+            if file.is_file():
+                file.unlink()
+                removed += 1
+    return removed
+
+
+def build_static_manifest(root, files=None, revalidate=(), min_bytes=MIN_BYTES, prune=False):
+    """
+        Precompress the text outputs under root and write root/static_manifest.json: for each file (path relative to
+        root) its size, SHA-256, content type, Cache-Control and compressed siblings ({"gzip": {"file", "bytes"}, ...}).
+        A static server answers a request with the smallest sibling the client accepts (Content-Encoding + the original
+        Content-Type, Vary: Accept-Encoding) and uses the hash as ETag.
+
+        files: outputs to (re)publish, by default every file under root. Entries of an existing manifest are kept
+        (merged) as long as their file still exists, and a file whose hash did not change is not recompressed.
+        revalidate: files whose name is stable while their content changes (the dashboards, a custom plotly.js...), served
+        with no-cache (revalidated with the ETag) instead of a one year immutable cache.
+        prune: the manifest lists exactly files, entries of files no longer published are dropped and their compressed
+        siblings deleted (the files themselves are left alone).
+    """
+    root = pathlib.Path(root)
+    manifest_path = root / MANIFEST_NAME
+    entries = {}
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            entries = json.load(f)["files"]
+
+    if files is None:
+        files = [path for path in root.rglob("*")
+                 if path.is_file() and path != manifest_path and not _is_sibling(path, min_bytes)]
+    files = [pathlib.Path(path) for path in files]
+    revalidate = {pathlib.Path(path).resolve() for path in revalidate}
+
+    if prune:
+        published = {path.resolve().relative_to(root.resolve()).as_posix() for path in files}
+        for rel in set(entries) - published:
+            for variant in entries.pop(rel)["encodings"].values():
+                (root / variant["file"]).unlink(missing_ok=True)
+
+    for path in files:
+        rel = path.resolve().relative_to(root.resolve()).as_posix()
+        sha256 = file_sha256(path)
+        previous = entries.get(rel, {})
+
+        encodings = {}
+        if path.suffix in COMPRESSIBLE and path.stat().st_size >= min_bytes:
+            unchanged = previous.get("sha256") == sha256 and all(
+                (root / variant["file"]).exists() for variant in previous.get("encodings", {}).values())
+            if unchanged and ("br" in previous.get("encodings", {}) or brotli is None):
+                encodings = previous["encodings"]
+            else:
+                encodings = {encoding: {"file": sibling.resolve().relative_to(root.resolve()).as_posix(), "bytes": size}
+                             for encoding, (sibling, size) in precompress(path).items()}
+
+        entries[rel] = {
+            "bytes": path.stat().st_size,
+            "sha256": sha256,
+            "content_type": content_type(path),
+            "cache_control": REVALIDATE_CACHE if path.resolve() in revalidate else IMMUTABLE_CACHE,
+            "encodings": encodings
+        }
+
+    entries = {rel: entry for rel, entry in sorted(entries.items()) if (root / rel).exists()}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"generated": datetime.now().isoformat(timespec="seconds"), "files": entries}, f, indent=2)
+    return manifest_path
+
+
+def compression_summary(manifest_path):
+    """Total bytes of a static manifest, raw and per encoding (a file without that sibling counts with its raw size)"""
+    with open(manifest_path, encoding="utf-8") as f:
+        entries = list(json.load(f)["files"].values())
+    total = {"raw": sum(entry["bytes"] for entry in entries)}
+    for encoding in sorted({encoding for entry in entries for encoding in entry["encodings"]}):
+        total[encoding] = sum(entry["encodings"].get(encoding, {"bytes": entry["bytes"]})["bytes"] for entry in entries)
+    return total
@@ -8,16 +8,25 @@ import matplotlib.pyplot as plt
 import logging
 import pathlib
 
+from outliers import load_flags, outlier_mask
+
+# Passer à True pour exclure les lignes marquées par outliers.py de toutes les agrégations
+EXCLUDE_OUTLIERS = False
+
 #%%
 ####################################################################################################################################
 # FUNCTIONS
 ####################################################################################################################################
 
-def selection(df, col, choice, lim, option):
+def selection(df, col, choice, lim, option, mask=None):
     """
         Cette fonction a pour but de s'assurer que lorsqu'une couleur est majoritaire, elle est bien prise en compte et mise dans les indices.
         De plus, une couleur de plus est ajoutée à la liste: la couleur qui dépasse du seuil
+        mask (optionnel) : booléens indexés comme le fichier ET, False pour les lignes à exclure (cf. outliers.outlier_mask)
     """
+    if mask is not None:
+        df = df[mask.reindex(df.index, fill_value=True)]
+
     res = df.groupby("Parent Label")[col].agg(["mean", "sum"])
     ord = res.sort_values(choice[0], ascending=choice[1])
 
@@ -57,6 +66,9 @@ def selection(df, col, choice, lim, option):
 def main():
     parent_path = pathlib.Path(__file__).parent.parent # Chemin parent du dossier (Emoskin)
     et = pd.read_excel(parent_path / "Files" / "ET_modified.xlsx", usecols="B:C, F:L, P:AO, AQ:AW, BC: BE", skiprows=6)
+    keep = None
+    if EXCLUDE_OUTLIERS:
+        keep = outlier_mask(load_flags(parent_path / "Results" / "Tableaux" / "Outliers" / "outlier_flags.xlsx"), et.index)
 
 
     feelings = ["Happy", "Relaxed", "Energized", "Surprised", "Self-Confident", "Sensual", "Reassured", "Calm", "Secured", "Intrigued", 
@@ -81,10 +93,10 @@ def main():
         # Importation des données et calcul des moyennes et sommes (qui peuvent être des paramètres intéressants)
         fixations_df = et_p2d.loc[et_p2d.loc[:, "Parent Label"].str.contains(feeling), :]
 
-        maxi_fix.append(selection(fixations_df, col_fix, ["sum", False], 0.3, "feeling"))
-        maxi_dur.append(selection(fixations_df, col_dur, ["sum", False], 0.3, "feeling"))
-        maxi_ttff.append(selection(fixations_df, col_ttff, ["mean", True], 0.1, "feeling"))
-        maxi_clicks.append(selection(fixations_df, col_clicks, ["sum", False], 0.3, "feeling"))
+        maxi_fix.append(selection(fixations_df, col_fix, ["sum", False], 0.3, "feeling", keep))
+        maxi_dur.append(selection(fixations_df, col_dur, ["sum", False], 0.3, "feeling", keep))
+        maxi_ttff.append(selection(fixations_df, col_ttff, ["mean", True], 0.1, "feeling", keep))
+        maxi_clicks.append(selection(fixations_df, col_clicks, ["sum", False], 0.3, "feeling", keep))
 
 
 
@@ -118,10 +130,10 @@ def main():
     for color in colors:
         fixations_df = et_p2d.loc[et_p2d.loc[:, "Parent Label"].str.contains(color), :]
 
-        maxi_fix.append(selection(fixations_df, col_fix, ["sum", False], 0.3, "color"))
-        maxi_dur.append(selection(fixations_df, col_dur, ["sum", False], 0.3, "color"))
-        maxi_ttff.append(selection(fixations_df, col_ttff, ["mean", True], 0.1, "color"))
-        maxi_clicks.append(selection(fixations_df, col_clicks, ["sum", False], 0.3, "color"))
+        maxi_fix.append(selection(fixations_df, col_fix, ["sum", False], 0.3, "color", keep))
+        maxi_dur.append(selection(fixations_df, col_dur, ["sum", False], 0.3, "color", keep))
+        maxi_ttff.append(selection(fixations_df, col_ttff, ["mean", True], 0.1, "color", keep))
+        maxi_clicks.append(selection(fixations_df, col_clicks, ["sum", False], 0.3, "color", keep))
 
     maxi = pd.concat([pd.Series(maxi_fix, name="Emotion of the max of fixation count", index=colors), 
         pd.Series(maxi_dur, name="Emotion of the max of avg duration of fixation", index=colors), 
@@ -8,18 +8,32 @@ import matplotlib.pyplot as plt
 import logging
 import pathlib
 
+from build_manifest import BuildManifest, content_hash
+
+# Passer à True pour réécrire tous les fichiers, même ceux dont les données n'ont pas changé
+FORCE_REBUILD = False
+
 
 #%%
 ####################################################################################################################################
 # FUNCTIONS
 ####################################################################################################################################
-def recup_infos_shades(colour, emotion, df, col_names):
+def recup_infos_shades(colour, emotion, df, col_names, res_path, manifest):
     df = df.loc[df.loc[:, "Parent Label"].str.contains(f"{emotion}_{colour}", na=False)]
     df = df[["Label_modified"] + col_names]
     df["Label_modified"] = df["Label_modified"].str.split("_").str[-1] # Normalement, cette ligne permet de récupérer 
     df = df.set_index("Label_modified")
-    df.to_excel(f"/home/user/Emoskin/Results/Shades_by_emotion/{emotion}_{colour}.xlsx")
-    print(f"Le fichier {emotion}_{colour}.xlsx a bien été enregistré !")
+
+    # Le fichier n'est réécrit que si sa tranche de données a changé depuis la dernière exécution
+    file_name = f"{emotion}_{colour}.xlsx"
+    key = f"shades_by_emotion/{file_name}"
+    digest = content_hash(df)
+    if manifest.is_fresh(key, digest):
+        print(f"Le fichier {file_name} est à jour")
+        return
+    df.to_excel(res_path / file_name)
+    manifest.record(key, digest, [res_path / file_name])
+    print(f"Le fichier {file_name} a bien été enregistré !")
 
 
 #%%
@@ -63,9 +77,14 @@ def main():
     col_dt = "Dwell time (fixation, ms)"
     col_names = [col_fix, col_dur, col_ttff, col_dt]
 
+    res_path = parent_path / "Results" / "Shades_by_emotion"
+    res_path.mkdir(parents=True, exist_ok=True)
+    manifest = BuildManifest(parent_path / "Results" / "build_manifest.json", force=FORCE_REBUILD)
+
     for feeling, colours in dico.items():
         for colour in colours:
-            recup_infos_shades(colour, feeling, et_p2d, col_names)
+            recup_infos_shades(colour, feeling, et_p2d, col_names, res_path, manifest)
+    manifest.save()
 
 
 
@@ -8,6 +8,13 @@ import matplotlib.pyplot as plt
 import logging
 import pathlib
 
+from et_dataset import annotate_labels
+from outliers import load_flags, outlier_mask
+from sketches import build_sketches, save_sketches, quantile_table
+
+# Passer à True pour exclure les lignes marquées par outliers.py des sommes et moyennes par shade
+EXCLUDE_OUTLIERS = False
+
 
 #%%
 ####################################################################################################################################
@@ -68,6 +75,9 @@ def main():
     col_clicks = "Mouse click count"
     mask = et_p2d.loc[:, "Parent Label"].str.contains("|".join(feelings)).tolist()
     et_p2d = et_p2d[mask]
+    if EXCLUDE_OUTLIERS:
+        flags = load_flags(parent_path / "Results" / "Tableaux" / "Outliers" / "outlier_flags.xlsx")
+        et_p2d = et_p2d[outlier_mask(flags, et_p2d.index)]
 
     # shades = fixations_df.loc[:, "Label"]  # List of all the possible shades but may be useless
 
@@ -118,6 +128,12 @@ def main():
 
     metrics_by_shade = metrics_by_shade.join(nb_clicks)
 
+    # Sketches de quantiles (TTFF, dwell time) par shade, feeling et famille de couleur, enregistrés avec les tableaux
+    # pour que les autres rapports aient médiane / P90 / IQR sans relire les lignes brutes
+    sketches = build_sketches(annotate_labels(et_p2d))
+    save_sketches(sketches, parent_path / "Results" / "Tableaux" / "Sketches" / "quantile_sketches.json")
+    metrics_by_shade = metrics_by_shade.join(quantile_table(sketches, "shade"))
+
     res_path = parent_path / "Results"
     res_path.mkdir(parents=True, exist_ok=True)
 